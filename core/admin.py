@@ -1,6 +1,10 @@
 from django.contrib import admin
 from django.contrib.auth.hashers import make_password
-from .models import Vehicle, Accident, Violation, TrafficSignal, Operator
+from .auth import invalidate_operator
+from .models import (
+    Vehicle, Accident, DispatchAssignment, ResponderUnit, Violation, TrafficSignal, SignalTimingPlan, Operator,
+    IncidentRollup, AccidentArchive, ViolationArchive,
+)
 
 
 @admin.register(Vehicle)
@@ -9,11 +13,30 @@ class VehicleAdmin(admin.ModelAdmin):
     search_fields = ('vehicle_id',)
 
 
+class DispatchAssignmentInline(admin.TabularInline):
+    model = DispatchAssignment
+    extra = 0
+
+
 @admin.register(Accident)
 class AccidentAdmin(admin.ModelAdmin):
     list_display = ('vehicle', 'severity', 'road_name', 'status', 'injuries', 'time')
     list_filter = ('severity', 'status')
     search_fields = ('vehicle', 'road_name')
+    inlines = [DispatchAssignmentInline]
+
+
+@admin.register(DispatchAssignment)
+class DispatchAssignmentAdmin(admin.ModelAdmin):
+    list_display = ('unit', 'responder', 'accident', 'state', 'dispatched_by', 'dispatched_at', 'released_at')
+    list_filter = ('unit', 'state')
+
+
+@admin.register(ResponderUnit)
+class ResponderUnitAdmin(admin.ModelAdmin):
+    list_display = ('unit_id', 'unit_type', 'status', 'lat', 'lng', 'last_updated')
+    list_filter = ('unit_type', 'status')
+    search_fields = ('unit_id',)
 
 
 @admin.register(Violation)
@@ -33,9 +56,48 @@ class OperatorAdmin(admin.ModelAdmin):
         if not change or 'password' in form.changed_data:
             obj.password = make_password(obj.password)
         super().save_model(request, obj, form, change)
+        invalidate_operator(obj.operator_id)
+        if 'operator_id' in form.changed_data and form.initial.get('operator_id'):
+            invalidate_operator(form.initial['operator_id'])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_operator(obj.operator_id)
+
+    def delete_queryset(self, request, queryset):
+        operator_ids = list(queryset.values_list('operator_id', flat=True))
+        super().delete_queryset(request, queryset)
+        for operator_id in operator_ids:
+            invalidate_operator(operator_id)
 
 
 @admin.register(TrafficSignal)
 class TrafficSignalAdmin(admin.ModelAdmin):
-    list_display = ('name', 'state', 'lat', 'lng', 'cycle_time')
+    list_display = ('name', 'state', 'lat', 'lng', 'cycle_time', 'green_split')
     list_filter = ('state',)
+
+
+@admin.register(SignalTimingPlan)
+class SignalTimingPlanAdmin(admin.ModelAdmin):
+    list_display = ('signal', 'cycle_time', 'green_split', 'ns_queue', 'ew_queue', 'throughput', 'started_at')
+    list_filter = ('signal',)
+
+
+@admin.register(IncidentRollup)
+class IncidentRollupAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'category', 'day', 'hour', 'road_name', 'cell_row', 'cell_col', 'count')
+    list_filter = ('kind', 'category')
+
+
+@admin.register(AccidentArchive)
+class AccidentArchiveAdmin(admin.ModelAdmin):
+    list_display = ('original_id', 'vehicle', 'severity', 'road_name', 'time', 'resolved_at', 'archived_at')
+    list_filter = ('severity',)
+    search_fields = ('vehicle', 'road_name')
+
+
+@admin.register(ViolationArchive)
+class ViolationArchiveAdmin(admin.ModelAdmin):
+    list_display = ('original_id', 'vehicle', 'violation_type', 'fine_amount', 'time', 'archived_at')
+    list_filter = ('violation_type',)
+    search_fields = ('vehicle',)
@@ -0,0 +1,116 @@
+"""
+Accident and violation hotspot analytics.
+
+Every new Accident/Violation increments one IncidentRollup bucket
+(kind x day x hour x grid cell x road x severity/type), so hotspot and
+time-of-day queries aggregate a few thousand rollup rows instead of
+scanning the raw tables.
+"""
+
+import datetime
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Accident, Violation, IncidentRollup
+from .roads import ROADS
+from .routing import road_at
+from .spatial import grid_cell, cell_center
+
+CELL_M = 500
+
+
+def accident_bucket(lat, lng, time, road_name, severity):
+    return _bucket('Accident', lat, lng, time, road_name, severity)
+
+
+def violation_bucket(lat, lng, time, violation_type):
+    # Violations carry no road name, so snap them to the road network.
+    road = road_at(lat, lng)
+    return _bucket('Violation', lat, lng, time, ROADS[road]["name"] if road is not None else '', violation_type)
+
+
+def _bucket(kind, lat, lng, time, road_name, category):
+    local = timezone.localtime(time)
+    row, col = grid_cell(lat, lng, CELL_M)
+    return (kind, local.date(), local.hour, row, col, road_name, category)
+
+
+def apply_deltas(deltas):
+    """
+    Add {bucket: (count, injuries, fines)} onto the rollup table.
+
+    Each bucket is an increment-in-place; a missing bucket is created, and
+    if a concurrent insert wins the race we fall back to the increment.
+    """
+    fields = ('kind', 'day', 'hour', 'cell_row', 'cell_col', 'road_name', 'category')
+    for bucket, (count, injuries, fines) in deltas.items():
+        lookup = dict(zip(fields, bucket))
+        increment = {
+            'count': F('count') + count,
+            'injuries': F('injuries') + injuries,
+            'fines': F('fines') + fines,
+        }
+        if IncidentRollup.objects.filter(**lookup).update(**increment):
+            continue
+        try:
+            with transaction.atomic():
+                IncidentRollup.objects.create(count=count, injuries=injuries, fines=fines, **lookup)
+        except IntegrityError:
+            IncidentRollup.objects.filter(**lookup).update(**increment)
+
+
+@receiver(post_save, sender=Accident)
+def rollup_accident(sender, instance, created, **kwargs):
+    if created:
+        bucket = accident_bucket(instance.lat, instance.lng, instance.time, instance.road_name, instance.severity)
+        apply_deltas({bucket: (1, instance.injuries, 0)})
+
+
+@receiver(post_save, sender=Violation)
+def rollup_violation(sender, instance, created, **kwargs):
+    if created:
+        bucket = violation_bucket(instance.lat, instance.lng, instance.time, instance.violation_type)
+        apply_deltas({bucket: (1, 0, instance.fine_amount)})
+
+
+def rollups(kind, days=None, category=None):
+    qs = IncidentRollup.objects.filter(kind=kind)
+    if days:
+        since = timezone.localdate() - datetime.timedelta(days=days - 1)
+        qs = qs.filter(day__gte=since)
+    if category:
+        qs = qs.filter(category=category)
+    return qs
+
+
+def hotspots(kind, by='cell', days=None, category=None, limit=10):
+    """Top grid cells (or roads) by incident count."""
+    qs = rollups(kind, days, category)
+    group = ('road_name',) if by == 'road' else ('cell_row', 'cell_col')
+    rows = (qs.values(*group)
+            .annotate(total=Sum('count'), injuries=Sum('injuries'), fines=Sum('fines'))
+            .order_by('-total')[:limit])
+    data = []
+    for r in rows:
+        item = {"count": r["total"], "injuries": r["injuries"], "fines": r["fines"]}
+        if by == 'road':
+            item["road_name"] = r["road_name"]
+        else:
+            item["lat"], item["lng"] = (round(x, 6) for x in cell_center(r["cell_row"], r["cell_col"], CELL_M))
+        data.append(item)
+    return data
+
+
+def hourly_profile(kind, days=None, category=None):
+    """Incident counts for each hour of the day, split by severity/type."""
+    profile = {}
+    for r in rollups(kind, days, category).values('hour', 'category').annotate(total=Sum('count')):
+        profile.setdefault(r['category'], [0] * 24)[r['hour']] = r['total']
+    return {
+        "total": [sum(counts[h] for counts in profile.values()) for h in range(24)],
+        "by_category": profile,
+    }
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import analytics  # noqa: F401  (connects rollup receivers)
+        from . import live_state  # noqa: F401  (connects event publishers)
@@ -0,0 +1,92 @@
+"""
+Operator authentication helpers.
+
+Role/active status is cached per operator so page loads don't hit the
+operators table; OperatorAdmin invalidates the entry on every change.
+Failed logins are counted per operator ID and per client IP (see
+client_ip for deployments behind a proxy), and once a limit is reached further attempts are refused before any password
+hashing happens.
+
+Both live in the default cache, so they are only shared between workers
+when CACHES points at a shared backend (see settings.py); with the default
+LocMemCache a role or active-flag change reaches other workers within
+STATUS_TTL, and each worker counts failures separately.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Operator
+
+STATUS_TTL = 300
+LOGIN_WINDOW = 300
+MAX_FAILURES_PER_OPERATOR = 5
+MAX_FAILURES_PER_IP = 20
+
+
+def _status_key(operator_id):
+    return f"operator:status:{operator_id}"
+
+
+def operator_status(operator_id):
+    """{'name', 'role', 'is_active'} for an operator, or None if it doesn't exist."""
+    key = _status_key(operator_id)
+    status = cache.get(key)
+    if status is None:
+        row = Operator.objects.filter(operator_id=operator_id).values('name', 'role', 'is_active').first()
+        status = row or {}
+        cache.set(key, status, STATUS_TTL)
+    return status or None
+
+
+def invalidate_operator(operator_id):
+    cache.delete(_status_key(operator_id))
+
+
+def is_active_operator(operator_id):
+    status = operator_status(operator_id) if operator_id else None
+    return bool(status and status['is_active'])
+
+
+def client_ip(request):
+    """
+    Address used for the per-IP login limit.
+
+    Behind a load balancer REMOTE_ADDR is the balancer for every request,
+    so settings.TRAFFIC_PROXY_HOPS names how many trusted proxies append to
+    X-Forwarded-For; the client is the entry the outermost one added. Only
+    those entries are trusted, as anything further left is client-supplied.
+    """
+    hops = getattr(settings, 'TRAFFIC_PROXY_HOPS', 0)
+    if hops:
+        forwarded = [a.strip() for a in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if a.strip()]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _failure_keys(operator_id, ip):
+    return [
+        (f"login:fail:op:{operator_id}", MAX_FAILURES_PER_OPERATOR),
+        (f"login:fail:ip:{ip}", MAX_FAILURES_PER_IP),
+    ]
+
+
+def login_blocked(operator_id, ip):
+    """True if this operator ID or IP has too many recent failed logins."""
+    counts = cache.get_many([key for key, _ in _failure_keys(operator_id, ip)])
+    return any(counts.get(key, 0) >= limit for key, limit in _failure_keys(operator_id, ip))
+
+
+def record_login_failure(operator_id, ip):
+    for key, _ in _failure_keys(operator_id, ip):
+        cache.add(key, 0, LOGIN_WINDOW)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr(); start a fresh window.
+            cache.set(key, 1, LOGIN_WINDOW)
+
+
+def clear_login_failures(operator_id):
+    cache.delete(f"login:fail:op:{operator_id}")
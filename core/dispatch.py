@@ -0,0 +1,128 @@
+"""
+Emergency unit dispatch.
+
+Units committed to an accident live in DispatchAssignment rows; the
+accident itself only moves Pending -> Dispatched -> Resolved. All writes go
+through conditional updates inside a transaction so two operators
+dispatching to the same accident at once can't lose each other's units.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Accident, DispatchAssignment, ResponderUnit
+
+UNITS = [u for u, _ in DispatchAssignment.UNIT_CHOICES]
+
+
+def status_display(status, units):
+    """Render the status string the dashboard shows, e.g. 'Dispatched (Ambulance, Police)'."""
+    if status == 'Dispatched' and units:
+        return f"Dispatched ({', '.join(dict.fromkeys(units))})"
+    return status
+
+
+def units_by_accident(accident_ids, state='Dispatched'):
+    """Map accident id -> list of unit names, in dispatch order."""
+    units = {}
+    rows = (DispatchAssignment.objects
+            .filter(accident_id__in=accident_ids, state=state)
+            .order_by('dispatched_at', 'id')
+            .values_list('accident_id', 'unit'))
+    for accident_id, unit in rows:
+        units.setdefault(accident_id, []).append(unit)
+    return units
+
+
+def dispatch_units(dispatches, operator_id=''):
+    """
+    Commit units to accidents in a single transaction.
+
+    `dispatches` is an iterable of (accident_id, [unit, ...]). Units already
+    assigned to an accident are left as they are. Raises
+    Accident.DoesNotExist if any accident is missing and ValueError for an
+    unknown unit or an accident that is already resolved; nothing is
+    written in either case. Returns {accident_id: status_display}.
+    """
+    wanted = {}
+    for accident_id, units in dispatches:
+        for unit in units:
+            if unit not in UNITS:
+                raise ValueError(f"Unknown unit: {unit}")
+        wanted.setdefault(int(accident_id), []).extend(units)
+
+    now = timezone.now()
+    with transaction.atomic():
+        found = dict(
+            Accident.objects.select_for_update()
+            .filter(id__in=wanted)
+            .values_list('id', 'status')
+        )
+        if len(found) != len(wanted):
+            raise Accident.DoesNotExist("Accident not found")
+        if any(status == 'Resolved' for status in found.values()):
+            raise ValueError("Accident already resolved")
+
+        DispatchAssignment.objects.bulk_create([
+            DispatchAssignment(accident_id=accident_id, unit=unit,
+                               dispatched_by=operator_id, dispatched_at=now)
+            for accident_id, units in wanted.items()
+            for unit in dict.fromkeys(units)
+        ], ignore_conflicts=True)
+        Accident.objects.filter(id__in=wanted, status='Pending').update(status='Dispatched')
+
+    units = units_by_accident(list(wanted))
+    return {accident_id: status_display('Dispatched', units.get(accident_id, []))
+            for accident_id in wanted}
+
+
+def dispatch_responder(accident_id, unit_id, operator_id=''):
+    """
+    Commit a specific responder unit to an accident.
+
+    The unit is claimed with a conditional Available -> Committed update, so
+    two operators picking the same recommendation can't both get it.
+    Raises ResponderUnit.DoesNotExist / Accident.DoesNotExist, or ValueError
+    if the unit is no longer available or the accident is resolved.
+    """
+    accident_id = int(accident_id)
+    with transaction.atomic():
+        status = (Accident.objects.select_for_update()
+                  .filter(id=accident_id).values_list('status', flat=True).first())
+        if status is None:
+            raise Accident.DoesNotExist("Accident not found")
+        if status == 'Resolved':
+            raise ValueError("Accident already resolved")
+
+        responder = ResponderUnit.objects.get(unit_id=unit_id)
+        claimed = (ResponderUnit.objects
+                   .filter(id=responder.id, status='Available')
+                   .update(status='Committed'))
+        if not claimed:
+            raise ValueError(f"Unit {unit_id} is not available")
+
+        DispatchAssignment.objects.create(
+            accident_id=accident_id, unit=responder.unit_type, responder=responder,
+            dispatched_by=operator_id)
+        Accident.objects.filter(id=accident_id, status='Pending').update(status='Dispatched')
+
+    units = units_by_accident([accident_id]).get(accident_id, [])
+    return status_display('Dispatched', units)
+
+
+def resolve(accident_id):
+    """Mark an accident resolved and release every unit committed to it."""
+    now = timezone.now()
+    with transaction.atomic():
+        updated = (Accident.objects
+                   .filter(id=accident_id)
+                   .exclude(status='Resolved')
+                   .update(status='Resolved', resolved_at=now))
+        if not updated and not Accident.objects.filter(id=accident_id).exists():
+            raise Accident.DoesNotExist("Accident not found")
+        active = DispatchAssignment.objects.filter(accident_id=accident_id, state='Dispatched')
+        ResponderUnit.objects.filter(
+            id__in=active.filter(responder__isnull=False).values('responder_id'),
+            status='Committed',
+        ).update(status='Available')
+        active.update(state='Released', released_at=now)
@@ -0,0 +1,173 @@
+"""
+Streaming bulk export of accidents and violations.
+
+Rows are read with QuerySet.iterator(), which uses a server-side cursor on
+databases that support one and fixed-size fetches elsewhere, and are
+encoded chunk by chunk, so memory stays flat regardless of row count.
+CSV is always available; Parquet and Arrow need pyarrow installed.
+"""
+
+import csv
+import datetime
+
+from django.utils import timezone
+
+from .models import Accident, Violation, AccidentArchive, ViolationArchive
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+CHUNK_SIZE = 5000
+
+EXPORTS = {
+    'accidents': (Accident, [
+        'id', 'vehicle', 'lat', 'lng', 'road_name', 'severity', 'description',
+        'injuries', 'time', 'status', 'resolved_at',
+    ]),
+    'violations': (Violation, [
+        'id', 'vehicle', 'lat', 'lng', 'speed', 'lane', 'violation_type',
+        'video_clip', 'fine_amount', 'time',
+    ]),
+    'archived_accidents': (AccidentArchive, [
+        'original_id', 'vehicle', 'lat', 'lng', 'road_name', 'severity', 'description',
+        'injuries', 'time', 'status', 'resolved_at', 'units', 'archived_at',
+    ]),
+    'archived_violations': (ViolationArchive, [
+        'original_id', 'vehicle', 'lat', 'lng', 'speed', 'lane', 'violation_type',
+        'video_clip', 'fine_amount', 'time', 'archived_at',
+    ]),
+}
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+
+
+def date_range(start=None, end=None):
+    """Aware [start, end) datetimes for inclusive local dates; either may be None."""
+    tz = timezone.get_current_timezone()
+    since = until = None
+    if start:
+        since = timezone.make_aware(datetime.datetime.combine(start, datetime.time.min), tz)
+    if end:
+        until = timezone.make_aware(datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time.min), tz)
+    return since, until
+
+
+def iter_rows(kind, start=None, end=None, chunk_size=CHUNK_SIZE):
+    model, fields = EXPORTS[kind]
+    qs = model.objects.order_by('id')
+    since, until = date_range(start, end)
+    if since:
+        qs = qs.filter(time__gte=since)
+    if until:
+        qs = qs.filter(time__lt=until)
+    return qs.values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, datetime.datetime) else value
+
+
+def csv_stream(kind, start=None, end=None, chunk_size=CHUNK_SIZE):
+    _, fields = EXPORTS[kind]
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields).encode()
+    lines = []
+    for row in iter_rows(kind, start, end, chunk_size):
+        lines.append(writer.writerow([_iso(v) for v in row]))
+        if len(lines) >= chunk_size:
+            yield "".join(lines).encode()
+            lines = []
+    if lines:
+        yield "".join(lines).encode()
+
+
+class _Drain:
+    """Append-only sink that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self.parts = []
+        self.closed = False
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+def _schema(kind):
+    model, fields = EXPORTS[kind]
+    types = {
+        'BigAutoField': pa.int64(),
+        'BigIntegerField': pa.int64(),
+        'IntegerField': pa.int64(),
+        'FloatField': pa.float64(),
+        'DateTimeField': pa.timestamp('us', tz='UTC'),
+    }
+    return pa.schema([
+        (f, types.get(model._meta.get_field(f).get_internal_type(), pa.string())) for f in fields
+    ])
+
+
+def _table(rows, schema):
+    columns = zip(*rows)
+    return pa.Table.from_arrays([pa.array(c, type=t) for c, t in zip(columns, schema.types)], schema=schema)
+
+
+def columnar_stream(kind, fmt, start=None, end=None, chunk_size=CHUNK_SIZE):
+    """Yield a Parquet file (one row group per chunk) or Arrow IPC stream."""
+    schema = _schema(kind)
+    sink = _Drain()
+    if fmt == 'parquet':
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    rows = []
+    for row in iter_rows(kind, start, end, chunk_size):
+        rows.append(row)
+        if len(rows) >= chunk_size:
+            writer.write_table(_table(rows, schema))
+            rows = []
+            yield sink.drain()
+    if rows:
+        writer.write_table(_table(rows, schema))
+    writer.close()
+    yield sink.drain()
+
+
+def export_stream(kind, fmt='csv', start=None, end=None, chunk_size=CHUNK_SIZE):
+    """Return an iterator of encoded byte chunks; raises ImportError early if pyarrow is missing."""
+    if fmt == 'csv':
+        return csv_stream(kind, start, end, chunk_size)
+    if pa is None:
+        raise ImportError("pyarrow is required for parquet/arrow export")
+    return columnar_stream(kind, fmt, start, end, chunk_size)
+
+
+def export_filename(kind, fmt, start=None, end=None):
+    span = f"_{start or 'start'}_{end or 'now'}" if start or end else ""
+    return f"{kind}{span}.{FORMATS[fmt][1]}"
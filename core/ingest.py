@@ -0,0 +1,194 @@
+"""
+Admission control for vehicle telemetry.
+
+/api/update/ no longer writes to the database in the request thread.
+Position updates go into a bounded per-process queue keyed by vehicle, so
+a newer position replaces the one still waiting for the same vehicle
+(drop-oldest coalescing), and a single background writer drains it in
+batches. When the queue is full, updates for vehicles that are not already
+queued are shed and the client gets 429 with Retry-After.
+
+Operator-facing reads and dispatch/resolve writes are wrapped in
+@priority; while any of them is in flight the writer holds off starting
+its next batch (up to PRIORITY_WAIT), so those requests do not queue
+behind telemetry for the SQLite write lock.
+"""
+
+import functools
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Vehicle
+from .live_state import get_backend, vehicle_record
+
+logger = logging.getLogger(__name__)
+
+# ── CONFIG ──
+QUEUE_SIZE = 5000       # distinct vehicles waiting to be written
+BATCH_SIZE = 500        # vehicles per writer transaction
+PRIORITY_WAIT = 0.25    # max seconds the writer yields to priority requests per batch
+
+FIELDS = ('lat', 'lng', 'speed', 'heading')
+
+
+def apply_updates(updates):
+    """
+    Write a batch of (vehicle_id, lat, lng, speed, heading) in a few queries.
+
+    A None value leaves that field as it is (or at the model default for a
+    new vehicle). The live snapshot is refreshed afterwards.
+    """
+    now = timezone.now()
+    latest = {u[0]: u for u in updates}
+    existing = {v.vehicle_id: v for v in Vehicle.objects.filter(vehicle_id__in=latest)}
+    rows, new = {}, []
+    for vid, *values in latest.values():
+        v = existing.get(vid) or Vehicle(vehicle_id=vid)
+        for field, value in zip(FIELDS, values):
+            if value is not None:
+                setattr(v, field, value)
+        v.last_updated = now
+        rows[vid] = v
+        if vid not in existing:
+            new.append(v)
+    with transaction.atomic():
+        Vehicle.objects.bulk_update(list(existing.values()), [*FIELDS, 'last_updated'])
+        Vehicle.objects.bulk_create(new, ignore_conflicts=True)
+    pks = {vid: v.pk for vid, v in existing.items()}
+    if new:
+        # ignore_conflicts leaves pk unset, so look the new rows up.
+        pks.update(Vehicle.objects.filter(vehicle_id__in=[v.vehicle_id for v in new]).values_list('vehicle_id', 'id'))
+    get_backend().set_vehicles({
+        vid: vehicle_record(pks[vid], v.lat, v.lng, v.speed, v.heading, now.timestamp())
+        for vid, v in rows.items() if vid in pks
+    })
+    return len(latest)
+
+
+class IngestQueue:
+    def __init__(self, size=QUEUE_SIZE, batch_size=BATCH_SIZE, writer=apply_updates):
+        self.size = size
+        self.batch_size = batch_size
+        self.writer = writer
+        self.pending = OrderedDict()
+        self.cond = threading.Condition()
+        self.thread = None
+        self.priority_inflight = 0
+        self.counters = {
+            "accepted": 0, "coalesced": 0, "shed": 0,
+            "written": 0, "batches": 0, "write_errors": 0, "rows_dropped": 0,
+            "priority_yields": 0,
+        }
+        self.last_batch_s = 0.0
+
+    def offer(self, updates):
+        """Queue updates; return how many were shed because the queue was full."""
+        shed = 0
+        with self.cond:
+            for vid, *values in updates:
+                queued = self.pending.get(vid)
+                if queued is not None:
+                    # Newer values win; fields the newer update leaves out keep the queued ones.
+                    values = [new if new is not None else old for new, old in zip(values, queued[1:])]
+                    self.counters["coalesced"] += 1
+                elif len(self.pending) >= self.size:
+                    shed += 1
+                    continue
+                # Overwriting keeps the vehicle's place in line, so a busy
+                # vehicle is not pushed back behind ones that report less often.
+                self.pending[vid] = (vid, *values)
+                self.counters["accepted"] += 1
+            self.counters["shed"] += shed
+            self._ensure_writer()
+            self.cond.notify()
+        return shed
+
+    def retry_after(self):
+        """Seconds a shed client should wait, from queue depth and recent batch time."""
+        with self.cond:
+            batches = len(self.pending) / self.batch_size
+            return max(1, math.ceil(batches * max(self.last_batch_s, 0.05)))
+
+    def _ensure_writer(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name='ingest-writer', daemon=True)
+            self.thread.start()
+
+    def _take_batch(self):
+        with self.cond:
+            while not self.pending:
+                self.cond.wait()
+            deadline = time.monotonic() + PRIORITY_WAIT
+            if self.priority_inflight:
+                self.counters["priority_yields"] += 1
+            while self.priority_inflight and time.monotonic() < deadline:
+                self.cond.wait(deadline - time.monotonic())
+            return [self.pending.popitem(last=False)[1] for _ in range(min(self.batch_size, len(self.pending)))]
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            started = time.perf_counter()
+            close_old_connections()
+            try:
+                self.writer(batch)
+                self.counters["written"] += len(batch)
+            except Exception:
+                self.counters["write_errors"] += 1
+                logger.exception("Ingest batch of %d updates failed", len(batch))
+                if len(batch) > 1:
+                    self._write_each(batch)
+            self.counters["batches"] += 1
+            self.last_batch_s = time.perf_counter() - started
+
+    def _write_each(self, batch):
+        # One bad row must not cost every other vehicle in the batch its
+        # position, so retry row by row and drop only the ones that fail.
+        for update in batch:
+            try:
+                self.writer([update])
+                self.counters["written"] += 1
+            except Exception:
+                self.counters["rows_dropped"] += 1
+                logger.exception("Dropped ingest update for %r", update[0])
+
+    def enter_priority(self):
+        with self.cond:
+            self.priority_inflight += 1
+
+    def exit_priority(self):
+        with self.cond:
+            self.priority_inflight -= 1
+            self.cond.notify_all()
+
+    def metrics(self):
+        with self.cond:
+            return {
+                "depth": len(self.pending),
+                "capacity": self.size,
+                "priority_inflight": self.priority_inflight,
+                "last_batch_ms": round(self.last_batch_s * 1000, 2),
+                "writer_alive": bool(self.thread and self.thread.is_alive()),
+                **self.counters,
+            }
+
+
+ingest_queue = IngestQueue()
+
+
+def priority(view):
+    """Mark a view as operator-facing so telemetry writes yield to it."""
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        ingest_queue.enter_priority()
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            ingest_queue.exit_priority()
+    return wrapper
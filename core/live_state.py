@@ -0,0 +1,386 @@
+"""
+Shared live state and pub/sub for multi-node deployments.
+
+The latest position of every vehicle and the event feed (new accidents,
+violations, dispatches, resolutions) go through a pluggable backend, so
+app servers behind a load balancer serve the same snapshot and see each
+other's events. Configure it in settings.LIVE_STATE:
+
+    LIVE_STATE = {'BACKEND': 'core.live_state.InMemoryBackend'}
+    LIVE_STATE = {'BACKEND': 'core.live_state.RedisBackend',
+                  'OPTIONS': {'url': 'redis://127.0.0.1:6379/0'}}
+
+InMemoryBackend is per-process (single node, the default): it only sees
+what the web server process itself writes and publishes. Accidents and
+violations created by the simulator, and evictions by run_maintenance,
+happen in other processes and don't reach its event feed; vehicles are
+still aged out of the snapshot on read, using each record's `updated`
+time and TRAFFIC_RETENTION['STALE_VEHICLE_MINUTES']. RedisBackend is
+shared by every process, speaks RESP over a plain socket so it needs no
+client library, and works against Redis or the
+`manage.py live_state_server` stand-in.
+"""
+
+import json
+import logging
+import queue
+import select
+import socket
+import threading
+import time
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .models import Vehicle, Accident, Violation
+
+VEHICLES_KEY = 'live:vehicles'
+EVENTS_CHANNEL = 'events'
+
+
+logger = logging.getLogger(__name__)
+
+
+def vehicle_record(pk, lat, lng, speed, heading, updated):
+    """Snapshot entry; `updated` is the epoch time of the position."""
+    return {"pk": pk, "lat": lat, "lng": lng, "speed": speed, "heading": heading, "updated": updated}
+
+
+class LiveStateBackend:
+    """Interface every backend implements."""
+
+    def set_vehicles(self, records):
+        """Upsert {vehicle_id: record} into the live snapshot."""
+        raise NotImplementedError
+
+    def get_vehicles(self):
+        """Return the whole snapshot as {vehicle_id: record}."""
+        raise NotImplementedError
+
+    def delete_vehicles(self, vehicle_ids):
+        raise NotImplementedError
+
+    def publish(self, channel, message):
+        raise NotImplementedError
+
+    def subscribe(self, channels):
+        """Return a subscription with get(timeout) -> (channel, message) or None, and close()."""
+        raise NotImplementedError
+
+
+# ── IN-MEMORY ──
+
+class _MemorySubscription:
+    def __init__(self, backend, channels):
+        self.backend = backend
+        self.channels = set(channels)
+        self.queue = queue.Queue(maxsize=1000)
+
+    def get(self, timeout=None):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.backend._unsubscribe(self)
+
+
+class InMemoryBackend(LiveStateBackend):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hashes = {}
+        self._subscribers = []
+
+    # Generic hash/pubsub primitives, also used by the RESP stand-in server.
+    def hset(self, key, mapping):
+        with self._lock:
+            self._hashes.setdefault(key, {}).update(mapping)
+
+    def hgetall(self, key):
+        with self._lock:
+            return dict(self._hashes.get(key, {}))
+
+    def hdel(self, key, fields):
+        with self._lock:
+            h = self._hashes.get(key, {})
+            return sum(1 for f in fields if h.pop(f, None) is not None)
+
+    def delete(self, key):
+        with self._lock:
+            return 1 if self._hashes.pop(key, None) is not None else 0
+
+    def set_vehicles(self, records):
+        self.hset(VEHICLES_KEY, records)
+
+    def get_vehicles(self):
+        return self.hgetall(VEHICLES_KEY)
+
+    def delete_vehicles(self, vehicle_ids):
+        self.hdel(VEHICLES_KEY, vehicle_ids)
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = [s for s in self._subscribers if channel in s.channels]
+        for s in subscribers:
+            try:
+                s.queue.put_nowait((channel, message))
+            except queue.Full:
+                # A stalled consumer loses events rather than blocking publishers.
+                pass
+        return len(subscribers)
+
+    def subscribe(self, channels):
+        sub = _MemorySubscription(self, channels)
+        with self._lock:
+            self._subscribers.append(sub)
+        return sub
+
+    def _unsubscribe(self, sub):
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+
+# ── REDIS PROTOCOL ──
+
+class RespError(Exception):
+    pass
+
+
+class RespConnection:
+    """
+    Minimal RESP2 client: enough for hashes and pub/sub.
+
+    Replies are parsed from our own receive buffer rather than a
+    socket.makefile() reader, because a file object refuses every read
+    after one has timed out; it also lets a subscriber tell whether a
+    message is already buffered before waiting on the socket.
+    """
+
+    def __init__(self, host='127.0.0.1', port=6379, db=0, password=None, timeout=5):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.buffer = bytearray()
+        if password:
+            self.command('AUTH', password)
+        if db:
+            self.command('SELECT', db)
+
+    @staticmethod
+    def encode(*args):
+        out = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            out.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(out)
+
+    def send(self, *args):
+        self.sock.sendall(self.encode(*args))
+
+    def _fill(self):
+        data = self.sock.recv(65536)
+        if not data:
+            raise ConnectionError("Connection closed by server")
+        self.buffer += data
+
+    def _readline(self):
+        while True:
+            end = self.buffer.find(b'\r\n')
+            if end >= 0:
+                line = bytes(self.buffer[:end])
+                del self.buffer[:end + 2]
+                return line
+            self._fill()
+
+    def _readexact(self, n):
+        while len(self.buffer) < n:
+            self._fill()
+        data = bytes(self.buffer[:n])
+        del self.buffer[:n]
+        return data
+
+    def wait_readable(self, timeout):
+        """True if a reply is buffered or arrives within `timeout` seconds."""
+        if self.buffer:
+            return True
+        readable, _, _ = select.select([self.sock], [], [], timeout)
+        return bool(readable)
+
+    def read(self):
+        line = self._readline()
+        kind, rest = line[:1], line[1:]
+        if kind == b'+':
+            return rest.decode()
+        if kind == b'-':
+            raise RespError(rest.decode())
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            n = int(rest)
+            if n < 0:
+                return None
+            return self._readexact(n + 2)[:-2]
+        if kind == b'*':
+            n = int(rest)
+            return None if n < 0 else [self.read() for _ in range(n)]
+        raise RespError(f"Unexpected reply: {line!r}")
+
+    def command(self, *args):
+        self.send(*args)
+        return self.read()
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class _RedisSubscription:
+    def __init__(self, conn, channels):
+        self.conn = conn
+        self.conn.send('SUBSCRIBE', *channels)
+        for _ in channels:
+            self.conn.read()  # subscribe confirmations
+        # Idle waits go through select(); once a message starts arriving,
+        # block until the rest of it is in.
+        self.conn.sock.settimeout(None)
+
+    def get(self, timeout=None):
+        if not self.conn.wait_readable(timeout):
+            return None
+        reply = self.conn.read()
+        if isinstance(reply, list) and len(reply) == 3 and reply[0] == b'message':
+            return reply[1].decode(), json.loads(reply[2])
+        return None
+
+    def close(self):
+        self.conn.close()
+
+
+class RedisBackend(LiveStateBackend):
+    def __init__(self, url='redis://127.0.0.1:6379/0', timeout=5):
+        parsed = urlparse(url)
+        self.options = {
+            'host': parsed.hostname or '127.0.0.1',
+            'port': parsed.port or 6379,
+            'db': int(parsed.path.lstrip('/') or 0),
+            'password': parsed.password,
+            'timeout': timeout,
+        }
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = RespConnection(**self.options)
+        return conn
+
+    def _command(self, *args):
+        try:
+            return self._conn().command(*args)
+        except (ConnectionError, OSError):
+            # Reconnect once; a second failure propagates.
+            self._local.conn = None
+            return self._conn().command(*args)
+
+    def set_vehicles(self, records):
+        if not records:
+            return
+        args = []
+        for vid, record in records.items():
+            args.extend((vid, json.dumps(record)))
+        self._command('HSET', VEHICLES_KEY, *args)
+
+    def get_vehicles(self):
+        flat = self._command('HGETALL', VEHICLES_KEY) or []
+        return {flat[i].decode(): json.loads(flat[i + 1]) for i in range(0, len(flat), 2)}
+
+    def delete_vehicles(self, vehicle_ids):
+        if vehicle_ids:
+            self._command('HDEL', VEHICLES_KEY, *vehicle_ids)
+
+    def publish(self, channel, message):
+        return self._command('PUBLISH', channel, json.dumps(message))
+
+    def subscribe(self, channels):
+        return _RedisSubscription(RespConnection(**self.options), channels)
+
+
+# ── ACCESS ──
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                config = getattr(settings, 'LIVE_STATE', {})
+                cls = import_string(config.get('BACKEND', 'core.live_state.InMemoryBackend'))
+                backend = cls(**config.get('OPTIONS', {}))
+                _seed(backend)
+                _backend = backend
+    return _backend
+
+
+def _seed(backend):
+    # A fresh backend (first node up, or Redis restarted) starts from the
+    # database copy, before any ingest can make the snapshot look non-empty.
+    if backend.get_vehicles():
+        return
+    backend.set_vehicles({
+        vid: vehicle_record(pk, lat, lng, speed, heading, updated.timestamp())
+        for pk, vid, lat, lng, speed, heading, updated in
+        Vehicle.objects.values_list('id', 'vehicle_id', 'lat', 'lng', 'speed', 'heading', 'last_updated')
+    })
+
+
+def vehicle_snapshot():
+    """Latest {vehicle_id: record} across all nodes, without vehicles that stopped reporting."""
+    from .maintenance import retention  # maintenance imports this module
+
+    backend = get_backend()
+    cutoff = time.time() - retention()['STALE_VEHICLE_MINUTES'] * 60
+    snapshot, stale = {}, []
+    for vid, record in backend.get_vehicles().items():
+        if record.get('updated', 0) < cutoff:
+            stale.append(vid)
+        else:
+            snapshot[vid] = record
+    if stale:
+        backend.delete_vehicles(stale)
+    return snapshot
+
+
+def publish_event(event_type, **data):
+    """
+    Best-effort publish to the event feed.
+
+    Callers have already committed (dispatch, resolve, a new accident), so
+    a pub/sub outage is logged rather than turned into a failed request.
+    """
+    try:
+        get_backend().publish(EVENTS_CHANNEL, {"type": event_type, "ts": time.time(), **data})
+    except Exception:
+        logger.exception("Could not publish %s event", event_type)
+
+
+@receiver(post_save, sender=Accident)
+def publish_accident(sender, instance, created, **kwargs):
+    if created:
+        publish_event('accident', id=instance.id, severity=instance.severity, road_name=instance.road_name,
+                      lat=instance.lat, lng=instance.lng)
+
+
+@receiver(post_save, sender=Violation)
+def publish_violation(sender, instance, created, **kwargs):
+    if created:
+        publish_event('violation', id=instance.id, violation_type=instance.violation_type,
+                      lat=instance.lat, lng=instance.lng)
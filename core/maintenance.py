@@ -0,0 +1,166 @@
+"""
+Retention and compaction for the hot tables.
+
+Resolved accidents and aged violations move to archive tables in batched
+transactions, vehicles that stopped reporting are evicted from the live
+set, and planner statistics are refreshed afterwards. A full SQLite
+VACUUM rewrites the whole file under an exclusive lock, blocking ingest
+and dispatch writes meanwhile, so it only runs once VACUUM_ROWS archived
+rows have built up. Unresolved
+accidents are never archived, however old, so nothing silently drops off
+an operator's panel. Rollups (core.analytics) are left untouched, so
+hotspot history survives archival.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Accident, Violation, Vehicle, AccidentArchive, ViolationArchive
+from .dispatch import units_by_accident
+from .live_state import get_backend
+
+BATCH_SIZE = 1000
+VACUUM_ROWS = 50000     # archived accident/violation rows between full SQLite VACUUMs
+
+DEFAULT_RETENTION = {
+    'RESOLVED_ACCIDENT_HOURS': 6,
+    'VIOLATION_DAYS': 30,
+    'STALE_VEHICLE_MINUTES': 5,
+}
+
+
+def retention():
+    return {**DEFAULT_RETENTION, **getattr(settings, 'TRAFFIC_RETENTION', {})}
+
+
+def archivable_accidents(now=None):
+    now = now or timezone.now()
+    cutoff = now - datetime.timedelta(hours=retention()['RESOLVED_ACCIDENT_HOURS'])
+    return Accident.objects.filter(status='Resolved', resolved_at__lt=cutoff)
+
+
+def archivable_violations(now=None):
+    now = now or timezone.now()
+    cutoff = now - datetime.timedelta(days=retention()['VIOLATION_DAYS'])
+    return Violation.objects.filter(time__lt=cutoff)
+
+
+def stale_vehicles(now=None):
+    now = now or timezone.now()
+    cutoff = now - datetime.timedelta(minutes=retention()['STALE_VEHICLE_MINUTES'])
+    return Vehicle.objects.filter(last_updated__lt=cutoff)
+
+
+def _archive_accident_batch(ids):
+    units = units_by_accident(ids, state='Released')
+    AccidentArchive.objects.bulk_create([
+        AccidentArchive(
+            original_id=a.id, vehicle=a.vehicle, lat=a.lat, lng=a.lng, road_name=a.road_name,
+            severity=a.severity, description=a.description, injuries=a.injuries, time=a.time,
+            status=a.status, resolved_at=a.resolved_at, units=", ".join(dict.fromkeys(units.get(a.id, []))),
+        )
+        for a in Accident.objects.filter(id__in=ids)
+    ], ignore_conflicts=True)
+    # Assignments cascade with the accident; their unit names live on in `units`.
+    Accident.objects.filter(id__in=ids).delete()
+
+
+def _archive_violation_batch(ids):
+    ViolationArchive.objects.bulk_create([
+        ViolationArchive(
+            original_id=v.id, vehicle=v.vehicle, lat=v.lat, lng=v.lng, speed=v.speed, lane=v.lane,
+            violation_type=v.violation_type, video_clip=v.video_clip, fine_amount=v.fine_amount, time=v.time,
+        )
+        for v in Violation.objects.filter(id__in=ids)
+    ], ignore_conflicts=True)
+    Violation.objects.filter(id__in=ids).delete()
+
+
+def _in_batches(qs, archive_batch, batch_size):
+    moved = 0
+    while True:
+        ids = list(qs.order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return moved
+        with transaction.atomic():
+            archive_batch(ids)
+        moved += len(ids)
+
+
+def table_bytes(model):
+    """On-disk size of a model's table (and its indexes where cheap), or None if unknown."""
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        try:
+            if connection.vendor == 'sqlite':
+                cursor.execute(
+                    "SELECT SUM(pgsize) FROM dbstat WHERE name = %s "
+                    "OR name IN (SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s)",
+                    [table, table])
+            elif connection.vendor == 'postgresql':
+                cursor.execute("SELECT pg_total_relation_size(%s)", [table])
+            else:
+                return None
+            row = cursor.fetchone()
+        except Exception:
+            # SQLite builds without SQLITE_ENABLE_DBSTAT_VTAB have no dbstat table.
+            return None
+    return row[0] if row and row[0] is not None else None
+
+
+def _estimate(model, qs):
+    rows = qs.count()
+    if not rows:
+        return {"rows": 0, "bytes": 0}
+    size = table_bytes(model)
+    total = model.objects.count()
+    return {"rows": rows, "bytes": round(size * rows / total) if size and total else None}
+
+
+def report(now=None):
+    """Rows (and estimated bytes) each job would reclaim, without changing anything."""
+    now = now or timezone.now()
+    return {
+        "accidents": _estimate(Accident, archivable_accidents(now)),
+        "violations": _estimate(Violation, archivable_violations(now)),
+        "stale_vehicles": _estimate(Vehicle, stale_vehicles(now)),
+    }
+
+
+def run(now=None, batch_size=BATCH_SIZE):
+    """Archive, evict and return rows moved per job."""
+    now = now or timezone.now()
+    return {
+        "accidents": _in_batches(archivable_accidents(now), _archive_accident_batch, batch_size),
+        "violations": _in_batches(archivable_violations(now), _archive_violation_batch, batch_size),
+        "stale_vehicles": _evict_vehicles(stale_vehicles(now)),
+    }
+
+
+def _evict_vehicles(qs):
+    ids = list(qs.values_list('vehicle_id', flat=True))
+    get_backend().delete_vehicles(ids)
+    return qs.filter(vehicle_id__in=ids).delete()[0]
+
+
+def vacuum_analyze(full=True):
+    """
+    Refresh planner statistics; with `full`, also return freed pages to the
+    filesystem. On SQLite that is a whole-file VACUUM, so callers should
+    pass full=False unless enough rows have been archived to be worth it.
+    """
+    tables = [m._meta.db_table for m in (Accident, Violation, Vehicle)]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            if full:
+                cursor.execute("VACUUM")
+            cursor.execute("ANALYZE")
+        elif connection.vendor == 'postgresql':
+            for table in tables:
+                cursor.execute(f'VACUUM ANALYZE "{table}"')
+        else:
+            for table in tables:
+                cursor.execute(f"ANALYZE TABLE {table}")
@@ -0,0 +1,52 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from core.export import EXPORTS, FORMATS, export_stream, export_filename
+
+
+class Command(BaseCommand):
+    help = "Stream accidents or violations to CSV, Parquet or Arrow in constant memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--start', help="First local date to include (YYYY-MM-DD)")
+        parser.add_argument('--end', help="Last local date to include (YYYY-MM-DD)")
+        parser.add_argument('--output', '-o',
+                            help="Output file, '-' for stdout (default: <kind>_<start>_<end>.<ext>)")
+        parser.add_argument('--chunk-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        start = end = None
+        try:
+            if options['start']:
+                start = parse_date(options['start'])
+            if options['end']:
+                end = parse_date(options['end'])
+        except ValueError as e:
+            raise CommandError(e)
+        if (options['start'] and not start) or (options['end'] and not end):
+            raise CommandError("Dates must be YYYY-MM-DD")
+
+        fmt = options['format']
+        try:
+            chunks = export_stream(options['kind'], fmt, start, end, options['chunk_size'])
+        except ImportError as e:
+            raise CommandError(e)
+
+        output = options['output'] or export_filename(options['kind'], fmt, start, end)
+        if output == '-':
+            out = sys.stdout.buffer
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
+            return
+
+        written = 0
+        with open(output, 'wb') as out:
+            for chunk in chunks:
+                out.write(chunk)
+                written += len(chunk)
+        self.stderr.write(f"  Wrote {written} bytes to {output}")
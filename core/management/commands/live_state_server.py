@@ -0,0 +1,115 @@
+import socketserver
+import threading
+
+from django.core.management.base import BaseCommand
+
+from core.live_state import InMemoryBackend
+
+
+def _read_command(rfile):
+    """Read one RESP array of bulk strings; None when the client hung up."""
+    line = rfile.readline()
+    if not line:
+        return None
+    if not line.startswith(b'*'):
+        return line.split()  # inline command, e.g. `PING` over telnet
+    args = []
+    for _ in range(int(line[1:-2])):
+        size = int(rfile.readline()[1:-2])
+        args.append(rfile.read(size + 2)[:-2])
+    return args
+
+
+def _bulk(value):
+    return b'$%d\r\n%s\r\n' % (len(value), value)
+
+
+def _array(items):
+    return b'*%d\r\n' % len(items) + b''.join(_bulk(i) for i in items)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        state = self.server.state
+        while True:
+            args = _read_command(self.rfile)
+            if args is None:
+                return
+            if not args:
+                continue
+            name, args = args[0].upper(), args[1:]
+            if name == b'SUBSCRIBE':
+                return self.subscribe([a.decode() for a in args])
+            if name == b'QUIT':
+                self.wfile.write(b'+OK\r\n')
+                return
+            self.wfile.write(self.execute(state, name, args))
+
+    def execute(self, state, name, args):
+        if name == b'PING':
+            return b'+PONG\r\n'
+        if name in (b'SELECT', b'AUTH'):
+            return b'+OK\r\n'
+        if name == b'HSET' and len(args) >= 3 and len(args) % 2 == 1:
+            fields = dict(zip(args[1::2], args[2::2]))
+            state.hset(args[0], fields)
+            return b':%d\r\n' % len(fields)
+        if name == b'HGETALL' and len(args) == 1:
+            flat = [x for pair in state.hgetall(args[0]).items() for x in pair]
+            return _array(flat)
+        if name == b'HDEL' and len(args) >= 2:
+            return b':%d\r\n' % state.hdel(args[0], args[1:])
+        if name == b'DEL':
+            return b':%d\r\n' % sum(state.delete(k) for k in args)
+        if name == b'PUBLISH' and len(args) == 2:
+            return b':%d\r\n' % state.publish(args[0].decode(), args[1])
+        return b"-ERR unknown command or wrong number of arguments for '%s'\r\n" % name.lower()
+
+    def subscribe(self, channels):
+        sub = self.server.state.subscribe(channels)
+        hung_up = threading.Event()
+
+        def watch():
+            # Subscribers only listen, so EOF on the read side means they left.
+            while _read_command(self.rfile) is not None:
+                pass
+            hung_up.set()
+
+        threading.Thread(target=watch, daemon=True).start()
+        try:
+            for i, channel in enumerate(channels, 1):
+                self.wfile.write(b'*3\r\n' + _bulk(b'subscribe') + _bulk(channel.encode()) + b':%d\r\n' % i)
+            while not hung_up.is_set():
+                message = sub.get(timeout=1)
+                if message is not None:
+                    channel, payload = message
+                    self.wfile.write(_array([b'message', channel.encode(), payload]))
+        except OSError:
+            pass
+        finally:
+            sub.close()
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class Command(BaseCommand):
+    help = ("Run a small Redis-protocol stand-in (hashes + pub/sub) for trying "
+            "LIVE_STATE = RedisBackend locally without a Redis install")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=6379)
+
+    def handle(self, *args, **options):
+        server = _Server((options['host'], options['port']), _Handler)
+        server.state = InMemoryBackend()
+        self.stdout.write(f"Live state stand-in listening on {options['host']}:{options['port']}. Press Ctrl+C to stop.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import SignalTimingPlan
+from core.signal_timing import optimize_signals, apply_phase_states, plan_summary
+
+
+class Command(BaseCommand):
+    help = "Adapt signal cycle length and green splits to live queue estimates"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=2,
+                            help="Seconds between optimization ticks")
+        parser.add_argument('--once', action='store_true',
+                            help="Re-plan every signal once and exit")
+
+    def handle(self, *args, **options):
+        if options['once']:
+            plans = optimize_signals(force=True)
+            apply_phase_states()
+            for p in plans:
+                self.stdout.write(
+                    f"  {p.signal.name:<20} cycle {p.cycle_time:>3}s  split {p.green_split:.2f}  "
+                    f"queue NS/EW {p.ns_queue}/{p.ew_queue}"
+                )
+            return
+
+        self.stdout.write("Adaptive signal timing running. Press Ctrl+C to stop.")
+        try:
+            while True:
+                for p in optimize_signals():
+                    self.stdout.write(
+                        f"  [PLAN] {p.signal.name}: cycle {p.cycle_time}s, split {p.green_split:.2f}"
+                    )
+                apply_phase_states()
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            recent = SignalTimingPlan.objects.filter(throughput__isnull=False)[:500]
+            summary = plan_summary(list(recent))
+            self.stdout.write(
+                f"\n  Plans: {summary['plans']} | Avg cycle: {summary['avg_cycle']}s | "
+                f"Throughput: {summary['throughput_per_hour']} veh/h"
+            )
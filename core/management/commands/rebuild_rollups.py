@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.analytics import accident_bucket, violation_bucket, apply_deltas
+from core.models import Accident, Violation, AccidentArchive, ViolationArchive, IncidentRollup
+
+
+class Command(BaseCommand):
+    help = ("Rebuild hotspot rollups from accident/violation history, live and archived, in id-ordered chunks. "
+            "Run while the simulator and ingest are paused, or new rows may be counted twice.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=['Accident', 'Violation'],
+                            help="Only rebuild one kind (default: both)")
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help="Rows read and aggregated per chunk")
+
+    def handle(self, *args, **options):
+        kinds = [options['kind']] if options['kind'] else ['Accident', 'Violation']
+        for kind in kinds:
+            if kind == 'Accident':
+                fields = ('id', 'lat', 'lng', 'time', 'road_name', 'severity', 'injuries')
+                sources = [Accident, AccidentArchive]
+            else:
+                fields = ('id', 'lat', 'lng', 'time', 'violation_type', 'fine_amount')
+                sources = [Violation, ViolationArchive]
+
+            IncidentRollup.objects.filter(kind=kind).delete()
+            total = 0
+            # Archived rows keep their rollup contribution, so replay them too.
+            for model in sources:
+                qs = model.objects.values_list(*fields)
+                last_id = 0
+                while True:
+                    chunk = list(qs.order_by('id').filter(id__gt=last_id)[:options['chunk_size']])
+                    if not chunk:
+                        break
+                    deltas = {}
+                    for row in chunk:
+                        if kind == 'Accident':
+                            _, lat, lng, time, road_name, severity, injuries = row
+                            bucket = accident_bucket(lat, lng, time, road_name, severity)
+                            delta = (1, injuries, 0)
+                        else:
+                            _, lat, lng, time, violation_type, fine = row
+                            bucket = violation_bucket(lat, lng, time, violation_type)
+                            delta = (1, 0, fine)
+                        c, i, f = deltas.get(bucket, (0, 0, 0))
+                        deltas[bucket] = (c + delta[0], i + delta[1], f + delta[2])
+                    with transaction.atomic():
+                        apply_deltas(deltas)
+                    last_id = chunk[-1][0]
+                    total += len(chunk)
+                    self.stdout.write(f"  {kind}: {total} rows", ending='\r')
+            self.stdout.write(f"\r  {kind}: {total} rows -> {IncidentRollup.objects.filter(kind=kind).count()} buckets")
@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError
+
+from core import maintenance
+
+
+class Command(BaseCommand):
+    help = "Archive resolved accidents and aged violations, evict stale vehicles, then ANALYZE (VACUUM once enough rows are archived)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Report rows and bytes that would be reclaimed, change nothing")
+        parser.add_argument('--batch-size', type=int, default=maintenance.BATCH_SIZE,
+                            help="Rows moved per transaction")
+        parser.add_argument('--no-vacuum', action='store_true', help="Skip VACUUM/ANALYZE")
+        parser.add_argument('--vacuum-rows', type=int, default=maintenance.VACUUM_ROWS,
+                            help="Archived rows to accumulate before a full VACUUM (0 = every run); ANALYZE only until then")
+        parser.add_argument('--every', type=int, metavar='SECONDS',
+                            help="Keep running, repeating every SECONDS")
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            for job, r in maintenance.report().items():
+                size = f"~{r['bytes'] / 1024:.1f} KB" if r['bytes'] is not None else "size unknown"
+                self.stdout.write(f"  {job:<15} {r['rows']:>8} rows  {size}")
+            return
+
+        self.archived = 0  # rows archived since the last full VACUUM
+        while True:
+            try:
+                self.run_pass(options)
+            except OperationalError as e:
+                # Typically "database is locked" by the ingest writer; a
+                # scheduled run retries next pass instead of exiting.
+                if not options['every']:
+                    raise
+                self.stderr.write(f"  Maintenance pass failed: {e}")
+            if not options['every']:
+                break
+            time.sleep(options['every'])
+
+    def run_pass(self, options):
+        moved = maintenance.run(batch_size=options['batch_size'])
+        self.stdout.write(
+            f"  Archived {moved['accidents']} accidents, {moved['violations']} violations; "
+            f"evicted {moved['stale_vehicles']} stale vehicles"
+        )
+        self.archived += moved['accidents'] + moved['violations']
+        if options['no_vacuum'] or not any(moved.values()):
+            return
+        full = self.archived >= options['vacuum_rows']
+        maintenance.vacuum_analyze(full=full)
+        if full:
+            self.archived = 0
+        self.stdout.write("  VACUUM/ANALYZE done" if full else "  ANALYZE done")
@@ -0,0 +1,40 @@
+# Generated by Django 6.0.2 on 2026-10-19 20:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_operator'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trafficsignal',
+            name='green_split',
+            field=models.FloatField(default=0.5),
+        ),
+        migrations.CreateModel(
+            name='SignalTimingPlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cycle_time', models.IntegerField()),
+                ('green_split', models.FloatField()),
+                ('ns_queue', models.IntegerField(default=0)),
+                ('ew_queue', models.IntegerField(default=0)),
+                ('ns_arrival_rate', models.FloatField(default=0)),
+                ('ew_arrival_rate', models.FloatField(default=0)),
+                ('throughput', models.IntegerField(blank=True, null=True)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ended_at', models.DateTimeField(blank=True, null=True)),
+                ('signal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timing_plans', to='core.trafficsignal')),
+            ],
+            options={
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['signal', 'ended_at'], name='core_signal_signal__b63b65_idx')],
+            },
+        ),
+    ]
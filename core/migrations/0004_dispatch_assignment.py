@@ -0,0 +1,68 @@
+# Generated by Django 6.0.2 on 2026-10-19 20:13
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def split_dispatched_status(apps, schema_editor):
+    Accident = apps.get_model('core', 'Accident')
+    DispatchAssignment = apps.get_model('core', 'DispatchAssignment')
+    for a in Accident.objects.filter(status__startswith='Dispatched ('):
+        units = [u.strip() for u in a.status.replace('Dispatched (', '').rstrip(')').split(',')]
+        for unit in dict.fromkeys(u for u in units if u):
+            DispatchAssignment.objects.get_or_create(
+                accident=a, unit=unit, defaults={'dispatched_at': a.time})
+        a.status = 'Dispatched'
+        a.save(update_fields=['status'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_signal_timing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DispatchAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unit', models.CharField(choices=[('Ambulance', 'Ambulance'), ('Police', 'Police'), ('Fire', 'Fire Truck'), ('Traffic Police', 'Traffic Police'), ('Tow Truck', 'Tow Truck'), ('Rescue Team', 'Rescue Team')], max_length=20)),
+                ('state', models.CharField(choices=[('Dispatched', 'Dispatched'), ('Released', 'Released')], default='Dispatched', max_length=20)),
+                ('dispatched_by', models.CharField(blank=True, max_length=20)),
+                ('dispatched_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('released_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['dispatched_at'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='accident',
+            name='status',
+            field=models.CharField(choices=[('Pending', 'Pending'), ('Dispatched', 'Dispatched'), ('Resolved', 'Resolved')], default='Pending', max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='accident',
+            index=models.Index(fields=['status', 'severity'], name='core_accide_status_5418a8_idx'),
+        ),
+        migrations.AddField(
+            model_name='dispatchassignment',
+            name='accident',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='core.accident'),
+        ),
+        migrations.AddIndex(
+            model_name='dispatchassignment',
+            index=models.Index(fields=['state', 'unit'], name='core_dispat_state_4290b3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dispatchassignment',
+            index=models.Index(fields=['unit'], name='core_dispat_unit_fcc009_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dispatchassignment',
+            constraint=models.UniqueConstraint(fields=('accident', 'unit'), name='unique_unit_per_accident'),
+        ),
+        migrations.RunPython(split_dispatched_status, migrations.RunPython.noop),
+    ]
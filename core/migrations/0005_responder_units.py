@@ -0,0 +1,46 @@
+# Generated by Django 6.0.2 on 2026-10-19 20:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_dispatch_assignment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResponderUnit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unit_id', models.CharField(max_length=20, unique=True)),
+                ('unit_type', models.CharField(choices=[('Ambulance', 'Ambulance'), ('Police', 'Police'), ('Fire', 'Fire Truck'), ('Traffic Police', 'Traffic Police'), ('Tow Truck', 'Tow Truck'), ('Rescue Team', 'Rescue Team')], max_length=20)),
+                ('lat', models.FloatField(default=27.7172)),
+                ('lng', models.FloatField(default=85.324)),
+                ('status', models.CharField(choices=[('Available', 'Available'), ('Committed', 'Committed'), ('Offline', 'Offline')], default='Available', max_length=20)),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['unit_id'],
+            },
+        ),
+        migrations.RemoveConstraint(
+            model_name='dispatchassignment',
+            name='unique_unit_per_accident',
+        ),
+        migrations.AddIndex(
+            model_name='responderunit',
+            index=models.Index(fields=['unit_type', 'status'], name='core_respon_unit_ty_43a85f_idx'),
+        ),
+        migrations.AddField(
+            model_name='dispatchassignment',
+            name='responder',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='assignments', to='core.responderunit'),
+        ),
+        migrations.AddConstraint(
+            model_name='dispatchassignment',
+            constraint=models.UniqueConstraint(condition=models.Q(('responder__isnull', True)), fields=('accident', 'unit'), name='unique_unit_per_accident'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.2 on 2026-10-19 20:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_responder_units'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IncidentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('Accident', 'Accident'), ('Violation', 'Violation')], max_length=10)),
+                ('day', models.DateField()),
+                ('hour', models.PositiveSmallIntegerField()),
+                ('cell_row', models.IntegerField()),
+                ('cell_col', models.IntegerField()),
+                ('road_name', models.CharField(blank=True, max_length=100)),
+                ('category', models.CharField(max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('injuries', models.IntegerField(default=0)),
+                ('fines', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-day', 'hour'],
+                'indexes': [models.Index(fields=['kind', 'day'], name='core_incide_kind_63b56d_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'day', 'hour', 'cell_row', 'cell_col', 'road_name', 'category'), name='unique_rollup_bucket')],
+            },
+        ),
+    ]
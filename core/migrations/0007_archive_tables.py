@@ -0,0 +1,56 @@
+# Generated by Django 6.0.2 on 2026-10-19 20:17
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_incident_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccidentArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(unique=True)),
+                ('vehicle', models.CharField(max_length=20)),
+                ('lat', models.FloatField()),
+                ('lng', models.FloatField()),
+                ('road_name', models.CharField(max_length=100)),
+                ('severity', models.CharField(choices=[('Minor', 'Minor'), ('Moderate', 'Moderate'), ('Severe', 'Severe'), ('Fatal', 'Fatal')], max_length=20)),
+                ('description', models.TextField()),
+                ('injuries', models.IntegerField(default=0)),
+                ('time', models.DateTimeField(db_index=True)),
+                ('status', models.CharField(max_length=50)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('units', models.CharField(blank=True, max_length=200)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-time'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ViolationArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(unique=True)),
+                ('vehicle', models.CharField(max_length=20)),
+                ('lat', models.FloatField()),
+                ('lng', models.FloatField()),
+                ('speed', models.FloatField()),
+                ('lane', models.CharField(max_length=10)),
+                ('violation_type', models.CharField(choices=[('Overspeeding', 'Overspeeding'), ('Wrong Lane', 'Wrong Lane'), ('Red Light', 'Red Light'), ('No Helmet', 'No Helmet')], max_length=50)),
+                ('video_clip', models.CharField(max_length=100)),
+                ('fine_amount', models.IntegerField(default=500)),
+                ('time', models.DateTimeField(db_index=True)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-time'],
+            },
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class Vehicle(models.Model):
@@ -24,6 +25,12 @@ class Accident(models.Model):
         ('Fatal', 'Fatal'),
     ]
 
+    STATUS_CHOICES = [
+        ('Pending', 'Pending'),
+        ('Dispatched', 'Dispatched'),
+        ('Resolved', 'Resolved'),
+    ]
+
     vehicle = models.CharField(max_length=20)
     lat = models.FloatField()
     lng = models.FloatField()
@@ -32,16 +39,80 @@ class Accident(models.Model):
     description = models.TextField(default="Vehicle accident reported")
     injuries = models.IntegerField(default=0)
     time = models.DateTimeField(auto_now_add=True)
-    status = models.CharField(max_length=50, default="Pending")
+    status = models.CharField(max_length=50, choices=STATUS_CHOICES, default="Pending")
     resolved_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ['-time']
+        indexes = [models.Index(fields=['status', 'severity'])]
 
     def __str__(self):
         return f"{self.vehicle} - {self.severity} @ {self.road_name}"
 
 
+class DispatchAssignment(models.Model):
+    UNIT_CHOICES = [
+        ('Ambulance', 'Ambulance'),
+        ('Police', 'Police'),
+        ('Fire', 'Fire Truck'),
+        ('Traffic Police', 'Traffic Police'),
+        ('Tow Truck', 'Tow Truck'),
+        ('Rescue Team', 'Rescue Team'),
+    ]
+
+    STATE_CHOICES = [
+        ('Dispatched', 'Dispatched'),
+        ('Released', 'Released'),
+    ]
+
+    accident = models.ForeignKey(Accident, on_delete=models.CASCADE, related_name='assignments')
+    unit = models.CharField(max_length=20, choices=UNIT_CHOICES)
+    responder = models.ForeignKey('ResponderUnit', on_delete=models.SET_NULL, null=True, blank=True,
+                                  related_name='assignments')
+    state = models.CharField(max_length=20, choices=STATE_CHOICES, default='Dispatched')
+    dispatched_by = models.CharField(max_length=20, blank=True)
+    dispatched_at = models.DateTimeField(default=timezone.now)
+    released_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['dispatched_at']
+        constraints = [
+            # Type-level dispatches stay idempotent; named responders can stack
+            # (e.g. three ambulances to one pileup).
+            models.UniqueConstraint(fields=['accident', 'unit'], condition=models.Q(responder__isnull=True),
+                                    name='unique_unit_per_accident'),
+        ]
+        indexes = [
+            models.Index(fields=['state', 'unit']),
+            models.Index(fields=['unit']),
+        ]
+
+    def __str__(self):
+        return f"{self.unit} -> accident #{self.accident_id} ({self.state})"
+
+
+class ResponderUnit(models.Model):
+    STATUS_CHOICES = [
+        ('Available', 'Available'),
+        ('Committed', 'Committed'),
+        ('Offline', 'Offline'),
+    ]
+
+    unit_id = models.CharField(max_length=20, unique=True)
+    unit_type = models.CharField(max_length=20, choices=DispatchAssignment.UNIT_CHOICES)
+    lat = models.FloatField(default=27.7172)
+    lng = models.FloatField(default=85.3240)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Available')
+    last_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['unit_id']
+        indexes = [models.Index(fields=['unit_type', 'status'])]
+
+    def __str__(self):
+        return f"{self.unit_id} ({self.unit_type}, {self.status})"
+
+
 class Violation(models.Model):
     VIOLATION_TYPES = [
         ('Overspeeding', 'Overspeeding'),
@@ -98,6 +169,100 @@ class TrafficSignal(models.Model):
     lng = models.FloatField()
     state = models.CharField(max_length=10, choices=SIGNAL_STATES, default='Green')
     cycle_time = models.IntegerField(default=60)
+    green_split = models.FloatField(default=0.5)
 
     def __str__(self):
         return f"{self.name} - {self.state}"
+
+
+class SignalTimingPlan(models.Model):
+    signal = models.ForeignKey(TrafficSignal, on_delete=models.CASCADE, related_name='timing_plans')
+    cycle_time = models.IntegerField()
+    green_split = models.FloatField()
+    ns_queue = models.IntegerField(default=0)
+    ew_queue = models.IntegerField(default=0)
+    ns_arrival_rate = models.FloatField(default=0)
+    ew_arrival_rate = models.FloatField(default=0)
+    throughput = models.IntegerField(null=True, blank=True)
+    started_at = models.DateTimeField(default=timezone.now)
+    ended_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [models.Index(fields=['signal', 'ended_at'])]
+
+    def __str__(self):
+        return f"{self.signal.name} - {self.cycle_time}s @ {self.green_split:.2f}"
+
+
+class IncidentRollup(models.Model):
+    KIND_CHOICES = [
+        ('Accident', 'Accident'),
+        ('Violation', 'Violation'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    day = models.DateField()
+    hour = models.PositiveSmallIntegerField()
+    cell_row = models.IntegerField()
+    cell_col = models.IntegerField()
+    road_name = models.CharField(max_length=100, blank=True)
+    category = models.CharField(max_length=50)
+    count = models.IntegerField(default=0)
+    injuries = models.IntegerField(default=0)
+    fines = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-day', 'hour']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'day', 'hour', 'cell_row', 'cell_col', 'road_name', 'category'],
+                name='unique_rollup_bucket',
+            ),
+        ]
+        indexes = [models.Index(fields=['kind', 'day'])]
+
+    def __str__(self):
+        return f"{self.kind} {self.category} {self.day} {self.hour:02d}h ({self.count})"
+
+
+class AccidentArchive(models.Model):
+    original_id = models.BigIntegerField(unique=True)
+    vehicle = models.CharField(max_length=20)
+    lat = models.FloatField()
+    lng = models.FloatField()
+    road_name = models.CharField(max_length=100)
+    severity = models.CharField(max_length=20, choices=Accident.SEVERITY_CHOICES)
+    description = models.TextField()
+    injuries = models.IntegerField(default=0)
+    time = models.DateTimeField(db_index=True)
+    status = models.CharField(max_length=50)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    units = models.CharField(max_length=200, blank=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-time']
+
+    def __str__(self):
+        return f"{self.vehicle} - {self.severity} @ {self.road_name} (archived)"
+
+
+class ViolationArchive(models.Model):
+    original_id = models.BigIntegerField(unique=True)
+    vehicle = models.CharField(max_length=20)
+    lat = models.FloatField()
+    lng = models.FloatField()
+    speed = models.FloatField()
+    lane = models.CharField(max_length=10)
+    violation_type = models.CharField(max_length=50, choices=Violation.VIOLATION_TYPES)
+    video_clip = models.CharField(max_length=100)
+    fine_amount = models.IntegerField(default=500)
+    time = models.DateTimeField(db_index=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-time']
+
+    def __str__(self):
+        return f"{self.vehicle} - {self.violation_type} (archived)"
@@ -0,0 +1,202 @@
+"""
+Opt-in profiling for live requests and simulator ticks.
+
+An Admin operator can profile a single request to any core.views endpoint
+by sending `X-Profile: cprofile` (or `sample`) or adding `?_profile=cprofile`
+(or `sample`). The flag is ignored for everyone else.
+
+    cprofile  deterministic; writes a pstats `.prof` (snakeviz, gprof2dot,
+              flameprof) plus an approximate `.folded` built from the call graph
+    sample    statistical; the request thread's stack is sampled every
+              SAMPLE_INTERVAL and written as collapsed stacks (`.folded`),
+              ready for flamegraph.pl or speedscope
+
+Files go to settings.TRAFFIC_PROFILE_DIR and the response carries
+X-Profile-File and a Server-Timing header. Only the view call is measured,
+so the body of a streaming response (exports, the event feed) is not.
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+from .auth import operator_status
+
+MODES = ('cprofile', 'sample')
+SAMPLE_INTERVAL = 0.001
+
+
+def profile_dir():
+    path = getattr(settings, 'TRAFFIC_PROFILE_DIR', os.path.join(settings.BASE_DIR, 'profiles'))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def output_path(name, suffix):
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    return os.path.join(profile_dir(), f"{stamp}-{int(time.time() * 1000) % 1000:03d}_{name}{suffix}")
+
+
+def frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def write_collapsed(counts, path):
+    """Write {stack_tuple: count} in collapsed-stack format, root first."""
+    with open(path, 'w') as f:
+        for stack, count in sorted(counts.items()):
+            f.write(f"{';'.join(stack)} {count}\n")
+    return path
+
+
+class Sampler:
+    """
+    Samples one thread's Python stack on a background thread.
+
+    Stacks are cut at `root` (a code object) so they start at the profiled
+    call rather than at the server's thread entry point. Sampling only
+    counts while `active` is set, which lets callers skip idle time.
+    """
+
+    def __init__(self, thread_id=None, root=None, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id or threading.get_ident()
+        self.root = root
+        self.interval = interval
+        self.counts = Counter()
+        self.active = threading.Event()
+        self.active.set()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _stack(self, frame):
+        stack = []
+        while frame is not None:
+            stack.append(frame_label(frame.f_code))
+            if frame.f_code is self.root:
+                break
+            frame = frame.f_back
+        return tuple(reversed(stack))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self.active.is_set():
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.counts[self._stack(frame)] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.counts
+
+
+def cprofile_collapsed(stats, root=None):
+    """
+    Approximate collapsed stacks from a cProfile call graph.
+
+    cProfile only records caller -> callee edges, so each function's own
+    time is spread over its callers in proportion to their call counts.
+    Values are microseconds. Recursion is cut at the first repeat.
+    """
+    entries = stats.stats  # func -> (cc, nc, tt, ct, callers)
+    callees = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[1]))
+    roots = [root] if root in entries else [f for f, e in entries.items() if not e[4]]
+    counts = Counter()
+
+    def label(func):
+        filename, line, name = func
+        return f"{name} ({os.path.basename(filename)}:{line})"
+
+    def walk(func, path, share):
+        cc, nc, tt, ct, callers = entries[func]
+        if ct * share < 1e-6:
+            return
+        path = path + (label(func),)
+        own = round(tt * share * 1e6)
+        if own:
+            counts[path] += own
+        for callee, calls in callees.get(func, []):
+            if label(callee) in path:
+                continue
+            callee_calls = entries[callee][1] or 1
+            walk(callee, path, share * min(1.0, calls / callee_calls))
+
+    for func in roots:
+        walk(func, (), 1.0)
+    return counts
+
+
+def _is_admin(request):
+    status = operator_status(request.session.get('operator_id')) if request.session.get('operator_id') else None
+    return bool(status and status['is_active'] and status['role'] == 'Admin')
+
+
+def requested_mode(request):
+    mode = request.META.get('HTTP_X_PROFILE') or request.GET.get('_profile')
+    return mode if mode in MODES else None
+
+
+class ProfileMiddleware:
+    """Profile a single core.views request when an Admin operator asks for it."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if view_func.__module__ != 'core.views':
+            return None
+        mode = requested_mode(request)
+        if mode is None or not _is_admin(request):
+            return None
+        return profile_view(mode, view_func.__name__, view_func, request, *view_args, **view_kwargs)
+
+
+def _call(view_func, request, *args, **kwargs):
+    return view_func(request, *args, **kwargs)
+
+
+def _call_key():
+    code = _call.__code__
+    return (code.co_filename, code.co_firstlineno, code.co_name)
+
+
+def profile_view(mode, name, view_func, request, *args, **kwargs):
+    started = time.perf_counter()
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        response = profiler.runcall(_call, view_func, request, *args, **kwargs)
+        elapsed = time.perf_counter() - started
+        path = output_path(name, '.prof')
+        profiler.dump_stats(path)
+        stats = pstats.Stats(profiler)
+        write_collapsed(cprofile_collapsed(stats, root=_call_key()), path[:-len('.prof')] + '.folded')
+    else:
+        sampler = Sampler(root=_call.__code__).start()
+        try:
+            response = _call(view_func, request, *args, **kwargs)
+        finally:
+            counts = sampler.stop()
+        elapsed = time.perf_counter() - started
+        path = write_collapsed(counts, output_path(name, '.folded'))
+    response['X-Profile-File'] = os.path.basename(path)
+    response['Server-Timing'] = f'app;dur={elapsed * 1000:.1f};desc="{mode}"'
+    return response
+
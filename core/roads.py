@@ -0,0 +1,20 @@
+"""Kathmandu road segments shared by the simulator and the routing graph."""
+
+ROADS = [
+    {"name": "Ring Road North",   "start": (27.7300, 85.3100), "end": (27.7300, 85.3400)},
+    {"name": "Ring Road South",   "start": (27.6900, 85.3100), "end": (27.6900, 85.3400)},
+    {"name": "Ring Road East",    "start": (27.6950, 85.3450), "end": (27.7300, 85.3450)},
+    {"name": "Ring Road West",    "start": (27.6950, 85.2850), "end": (27.7300, 85.2850)},
+    {"name": "Durbar Marg",       "start": (27.7120, 85.3140), "end": (27.7200, 85.3200)},
+    {"name": "Kantipath",         "start": (27.7050, 85.3150), "end": (27.7200, 85.3150)},
+    {"name": "Maharajgunj",       "start": (27.7250, 85.3250), "end": (27.7350, 85.3350)},
+    {"name": "Balaju",            "start": (27.7250, 85.3050), "end": (27.7350, 85.3100)},
+    {"name": "Kalanki",           "start": (27.6950, 85.2800), "end": (27.7050, 85.3000)},
+    {"name": "Koteshwor",         "start": (27.6750, 85.3400), "end": (27.6900, 85.3500)},
+    {"name": "New Baneshwor",     "start": (27.6900, 85.3300), "end": (27.7000, 85.3400)},
+    {"name": "Thamel",            "start": (27.7150, 85.3100), "end": (27.7220, 85.3150)},
+    {"name": "Lazimpat",          "start": (27.7200, 85.3200), "end": (27.7280, 85.3250)},
+    {"name": "Patan Dhoka",       "start": (27.6750, 85.3200), "end": (27.6850, 85.3280)},
+    {"name": "Satdobato",         "start": (27.6600, 85.3250), "end": (27.6750, 85.3300)},
+    {"name": "Chabahil",          "start": (27.7180, 85.3400), "end": (27.7250, 85.3480)},
+]
@@ -0,0 +1,208 @@
+"""
+Travel-time routing over the Kathmandu road graph.
+
+Nodes are road segment endpoints. Each road is an edge whose travel time
+comes from the live average speed of vehicles on it; nearby endpoints are
+joined by local-street connectors at a fixed speed. All-pairs travel times
+are cached per process and rebuilt when older than MATRIX_REFRESH_S, so a
+unit recommendation costs a few grid lookups and matrix reads.
+"""
+
+import heapq
+import math
+import threading
+import time
+
+from django.db import connections
+
+from .models import Vehicle, ResponderUnit
+from .roads import ROADS
+from .spatial import GridIndex, haversine_m
+
+# ── CONFIG ──
+MATRIX_REFRESH_S = 30
+DEFAULT_ROAD_KMH = 30        # used for roads with no live telemetry
+MIN_ROAD_KMH = 5
+CONNECTOR_KMH = 20           # local streets between road endpoints
+CONNECTOR_NEIGHBOURS = 4
+CONNECTOR_MAX_M = 1500
+ROAD_SNAP_M = 100            # max distance for a vehicle to count towards a road's speed
+ACCESS_KMH = 20              # off-graph leg between a point and its nearest node
+DETOUR_FACTOR = 1.4          # straight-line fallback when the graph doesn't help
+CANDIDATES = 25              # nearest units (straight-line) considered per request
+
+_lock = threading.Lock()
+_matrix = None
+
+
+def _build_graph():
+    nodes = []
+    node_index = GridIndex(cell_m=500)
+    roads = []
+    for road in ROADS:
+        ends = []
+        for lat, lng in (road["start"], road["end"]):
+            node = len(nodes)
+            nodes.append((lat, lng))
+            node_index.insert(lat, lng, node)
+            ends.append(node)
+        roads.append((ends[0], ends[1], haversine_m(*road["start"], *road["end"])))
+
+    connectors = []
+    for node, (lat, lng) in enumerate(nodes):
+        near = node_index.nearest(lat, lng, k=CONNECTOR_NEIGHBOURS + 1, max_radius_m=CONNECTOR_MAX_M)
+        for dist, other in near:
+            if other != node and dist <= CONNECTOR_MAX_M:
+                connectors.append((node, other, dist))
+    return nodes, node_index, roads, connectors
+
+
+NODES, NODE_INDEX, ROAD_EDGES, CONNECTOR_EDGES = _build_graph()
+
+
+def _road_sample_index(step_m=50):
+    index = GridIndex(cell_m=ROAD_SNAP_M)
+    for i, road in enumerate(ROADS):
+        length = haversine_m(*road["start"], *road["end"])
+        n = max(int(length / step_m), 1)
+        for k in range(n + 1):
+            t = k / n
+            lat = road["start"][0] + t * (road["end"][0] - road["start"][0])
+            lng = road["start"][1] + t * (road["end"][1] - road["start"][1])
+            index.insert(lat, lng, i)
+    return index
+
+
+ROAD_SAMPLES = _road_sample_index()
+
+
+def road_at(lat, lng):
+    """Index into ROADS of the road a point lies on, or None if off-network."""
+    near = ROAD_SAMPLES.nearest(lat, lng, k=1, max_radius_m=ROAD_SNAP_M)
+    return near[0][1] if near else None
+
+
+def live_road_speeds():
+    """Average km/h of vehicles on each road, DEFAULT_ROAD_KMH where there's no data."""
+    totals = [0.0] * len(ROADS)
+    counts = [0] * len(ROADS)
+    for lat, lng, speed in Vehicle.objects.values_list('lat', 'lng', 'speed').iterator(chunk_size=2000):
+        road = road_at(lat, lng)
+        if road is not None:
+            totals[road] += speed
+            counts[road] += 1
+    return [max(totals[i] / counts[i], MIN_ROAD_KMH) if counts[i] else DEFAULT_ROAD_KMH
+            for i in range(len(ROADS))]
+
+
+def _dijkstra(adj, source):
+    dist = [math.inf] * len(adj)
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        d, node = heapq.heappop(heap)
+        if d > dist[node]:
+            continue
+        for other, cost in adj[node]:
+            nd = d + cost
+            if nd < dist[other]:
+                dist[other] = nd
+                heapq.heappush(heap, (nd, other))
+    return dist
+
+
+def build_matrix(road_speeds=None):
+    """All-pairs node travel times in seconds, weighted by live road speeds."""
+    road_speeds = road_speeds or live_road_speeds()
+    adj = [[] for _ in NODES]
+    for i, (a, b, length) in enumerate(ROAD_EDGES):
+        cost = length / (road_speeds[i] / 3.6)
+        adj[a].append((b, cost))
+        adj[b].append((a, cost))
+    for a, b, length in CONNECTOR_EDGES:
+        cost = length / (CONNECTOR_KMH / 3.6)
+        adj[a].append((b, cost))
+        adj[b].append((a, cost))
+    return {
+        "times": [_dijkstra(adj, n) for n in range(len(NODES))],
+        "road_speeds": road_speeds,
+        "built_at": time.monotonic(),
+    }
+
+
+def _rebuild():
+    global _matrix
+    try:
+        _matrix = build_matrix()
+    finally:
+        connections.close_all()
+        _lock.release()
+
+
+def get_matrix(force=False):
+    """
+    Return the cached travel-time matrix.
+
+    Once it is stale, one background thread rebuilds it while callers keep
+    getting the previous matrix, so recommendations never wait on Dijkstra.
+    Only the very first call (or force=True) builds inline.
+    """
+    global _matrix
+    current = _matrix
+    if not force and current and time.monotonic() - current["built_at"] < MATRIX_REFRESH_S:
+        return current
+    if current is None or force:
+        with _lock:
+            if force or _matrix is None:
+                _matrix = build_matrix()
+            return _matrix
+    if _lock.acquire(blocking=False):
+        threading.Thread(target=_rebuild, name='matrix-rebuild', daemon=True).start()
+    return current
+
+
+def _access(lat, lng, k=2):
+    """Nearest graph nodes to a point as [(node, seconds_to_reach)]."""
+    return [(node, dist / (ACCESS_KMH / 3.6))
+            for dist, node in NODE_INDEX.nearest(lat, lng, k=k)]
+
+
+def travel_time(matrix, from_latlng, to_latlng):
+    """Estimated seconds between two points via the road graph."""
+    direct = DETOUR_FACTOR * haversine_m(*from_latlng, *to_latlng) / (ACCESS_KMH / 3.6)
+    best = direct
+    times = matrix["times"]
+    for a, ta in _access(*from_latlng):
+        for b, tb in _access(*to_latlng):
+            best = min(best, ta + times[a][b] + tb)
+    return best
+
+
+def recommend_units(lat, lng, unit_type=None, k=5):
+    """
+    Rank available responder units by estimated travel time to a point.
+
+    The nearest CANDIDATES units by straight-line distance are pulled from
+    a grid index, then ordered by road-graph ETA.
+    """
+    matrix = get_matrix()
+    qs = ResponderUnit.objects.filter(status='Available')
+    if unit_type:
+        qs = qs.filter(unit_type=unit_type)
+
+    index = GridIndex(cell_m=1000)
+    for unit_id, utype, ulat, ulng in qs.values_list('unit_id', 'unit_type', 'lat', 'lng'):
+        index.insert(ulat, ulng, (unit_id, utype, ulat, ulng))
+
+    ranked = []
+    for dist, (unit_id, utype, ulat, ulng) in index.nearest(lat, lng, k=CANDIDATES):
+        ranked.append({
+            "unit_id": unit_id,
+            "unit_type": utype,
+            "lat": ulat,
+            "lng": ulng,
+            "distance_m": round(dist),
+            "eta_s": round(travel_time(matrix, (ulat, ulng), (lat, lng))),
+        })
+    ranked.sort(key=lambda r: r["eta_s"])
+    return ranked[:k]
@@ -0,0 +1,183 @@
+"""
+Adaptive signal timing for Kathmandu traffic signals.
+
+Each signal runs a two-phase plan: the north-south approach gets the first
+``green_split`` share of the effective green, east-west gets the rest.
+Demand per approach is estimated from live vehicle telemetry near the
+signal, and cycle length is chosen with Webster's formula within bounds.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Vehicle, TrafficSignal, SignalTimingPlan
+from .spatial import GridIndex, bearing_deg
+
+# ── CONFIG ──
+APPROACH_RADIUS_M = 250
+QUEUE_SPEED_KMH = 20            # same threshold as the congestion heatmap
+SATURATION_FLOW = 0.5           # veh/s per approach (~1800 veh/h)
+YELLOW_TIME = 3                 # seconds, per phase
+LOST_TIME_PER_PHASE = 4         # seconds, start-up + clearance
+MIN_CYCLE = 40
+MAX_CYCLE = 150
+MIN_SPLIT = 0.25
+MAX_SPLIT = 0.75
+MAX_FLOW_RATIO = 0.9
+
+
+def approach_of(heading):
+    """Classify a heading (degrees) as the 'NS' or 'EW' approach."""
+    h = heading % 180
+    return "NS" if h < 45 or h >= 135 else "EW"
+
+
+def phase_states(cycle_time, green_split, t):
+    """
+    Return (ns_state, ew_state) at t seconds into the cycle.
+
+    Cycle layout: NS green, NS yellow, EW green, EW yellow.
+    """
+    effective = max(cycle_time - 2 * YELLOW_TIME, 2)
+    ns_green = effective * green_split
+    t = t % cycle_time
+    if t < ns_green:
+        return "Green", "Red"
+    if t < ns_green + YELLOW_TIME:
+        return "Yellow", "Red"
+    if t < cycle_time - YELLOW_TIME:
+        return "Red", "Green"
+    return "Red", "Yellow"
+
+
+def estimate_demand(signal_lat, signal_lng, index, radius_m=APPROACH_RADIUS_M):
+    """
+    Estimate queue length and arrival rate per approach around a signal.
+
+    Vehicles below QUEUE_SPEED_KMH count as queued. Moving vehicles give a
+    flow estimate of density x speed; half of them are assumed to be
+    heading towards the signal since telemetry carries the road axis only.
+    """
+    demand = {
+        "NS": {"queue": 0, "arrival_rate": 0.0},
+        "EW": {"queue": 0, "arrival_rate": 0.0},
+    }
+    for _, (lat, lng, speed, heading) in index.within(signal_lat, signal_lng, radius_m):
+        approach = approach_of(heading)
+        if approach != approach_of(bearing_deg(signal_lat, signal_lng, lat, lng)):
+            # Off-axis vehicles are on a crossing road, not this approach.
+            continue
+        if speed < QUEUE_SPEED_KMH:
+            demand[approach]["queue"] += 1
+        else:
+            speed_ms = speed / 3.6
+            demand[approach]["arrival_rate"] += 0.5 * speed_ms / radius_m
+    return demand
+
+
+def plan_timing(demand, prev_cycle):
+    """
+    Choose (cycle_time, green_split) for the next cycle from demand.
+
+    Queued vehicles are spread over the previous cycle as extra arrivals,
+    then Webster's optimum cycle is clamped to [MIN_CYCLE, MAX_CYCLE] and
+    green is split in proportion to each approach's flow ratio.
+    """
+    ratios = {}
+    for approach, d in demand.items():
+        flow = d["arrival_rate"] + d["queue"] / max(prev_cycle, 1)
+        ratios[approach] = flow / SATURATION_FLOW
+
+    total = min(sum(ratios.values()), MAX_FLOW_RATIO)
+    lost = LOST_TIME_PER_PHASE * len(ratios)
+    cycle = (1.5 * lost + 5) / (1 - total)
+    cycle = int(round(max(MIN_CYCLE, min(MAX_CYCLE, cycle))))
+
+    if sum(ratios.values()) > 0:
+        split = ratios["NS"] / sum(ratios.values())
+    else:
+        split = 0.5
+    split = round(max(MIN_SPLIT, min(MAX_SPLIT, split)), 3)
+    return cycle, split
+
+
+def build_vehicle_index():
+    index = GridIndex(cell_m=APPROACH_RADIUS_M)
+    for lat, lng, speed, heading in Vehicle.objects.values_list('lat', 'lng', 'speed', 'heading'):
+        index.insert(lat, lng, (lat, lng, speed, heading))
+    return index
+
+
+def optimize_signals(index=None, now=None, force=False):
+    """
+    Re-plan every signal whose current cycle has elapsed.
+
+    The plan being replaced gets its measured throughput: vehicles that
+    were queued or arrived during the plan minus those still queued.
+    Returns the list of newly created plans.
+    """
+    now = now or timezone.now()
+    index = index or build_vehicle_index()
+    current = {}
+    for plan in SignalTimingPlan.objects.filter(ended_at__isnull=True):
+        current[plan.signal_id] = plan
+
+    created = []
+    with transaction.atomic():
+        for sig in TrafficSignal.objects.all():
+            prev = current.get(sig.id)
+            if prev and not force:
+                elapsed = (now - prev.started_at).total_seconds()
+                if elapsed < prev.cycle_time:
+                    continue
+
+            demand = estimate_demand(sig.lat, sig.lng, index)
+            cycle, split = plan_timing(demand, sig.cycle_time)
+
+            if prev:
+                elapsed = max((now - prev.started_at).total_seconds(), 0)
+                arrived = (prev.ns_arrival_rate + prev.ew_arrival_rate) * elapsed
+                still_queued = demand["NS"]["queue"] + demand["EW"]["queue"]
+                prev.throughput = max(0, int(round(prev.ns_queue + prev.ew_queue + arrived - still_queued)))
+                prev.ended_at = now
+                prev.save(update_fields=['throughput', 'ended_at'])
+
+            TrafficSignal.objects.filter(id=sig.id).update(cycle_time=cycle, green_split=split)
+            created.append(SignalTimingPlan(
+                signal=sig,
+                cycle_time=cycle,
+                green_split=split,
+                ns_queue=demand["NS"]["queue"],
+                ew_queue=demand["EW"]["queue"],
+                ns_arrival_rate=round(demand["NS"]["arrival_rate"], 4),
+                ew_arrival_rate=round(demand["EW"]["arrival_rate"], 4),
+                started_at=now,
+            ))
+        SignalTimingPlan.objects.bulk_create(created)
+    return created
+
+
+def apply_phase_states(now=None):
+    """Set each signal's displayed state (the NS approach) from its active plan."""
+    now = now or timezone.now()
+    started = dict(
+        SignalTimingPlan.objects.filter(ended_at__isnull=True).values_list('signal_id', 'started_at')
+    )
+    for sig in TrafficSignal.objects.all():
+        start = started.get(sig.id, now)
+        ns_state, _ = phase_states(sig.cycle_time, sig.green_split, (now - start).total_seconds())
+        if ns_state != sig.state:
+            TrafficSignal.objects.filter(id=sig.id).update(state=ns_state)
+
+
+def plan_summary(plans):
+    """Vehicles discharged per hour across finished plans, for reporting."""
+    finished = [p for p in plans if p.throughput is not None]
+    if not finished:
+        return {"plans": 0, "avg_cycle": 0, "throughput_per_hour": 0}
+    seconds = sum(p.cycle_time for p in finished)
+    return {
+        "plans": len(finished),
+        "avg_cycle": round(sum(p.cycle_time for p in finished) / len(finished), 1),
+        "throughput_per_hour": round(sum(p.throughput for p in finished) * 3600 / max(seconds, 1), 1),
+    }
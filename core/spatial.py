@@ -0,0 +1,82 @@
+import math
+from collections import defaultdict
+
+EARTH_RADIUS_M = 6371000
+METERS_PER_DEG_LAT = 111320
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in meters."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def bearing_deg(lat1, lng1, lat2, lng2):
+    """Initial bearing from point 1 to point 2, 0-360 clockwise from north."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dl = math.radians(lng2 - lng1)
+    x = math.sin(dl) * math.cos(p2)
+    y = math.cos(p1) * math.sin(p2) - math.sin(p1) * math.cos(p2) * math.cos(dl)
+    return math.degrees(math.atan2(x, y)) % 360
+
+
+def grid_cell(lat, lng, cell_m, ref_lat=27.7172):
+    """(row, col) of the fixed-size grid cell containing a point."""
+    cell_lat = cell_m / METERS_PER_DEG_LAT
+    cell_lng = cell_m / (METERS_PER_DEG_LAT * math.cos(math.radians(ref_lat)))
+    return int(math.floor(lat / cell_lat)), int(math.floor(lng / cell_lng))
+
+
+def cell_center(row, col, cell_m, ref_lat=27.7172):
+    cell_lat = cell_m / METERS_PER_DEG_LAT
+    cell_lng = cell_m / (METERS_PER_DEG_LAT * math.cos(math.radians(ref_lat)))
+    return (row + 0.5) * cell_lat, (col + 0.5) * cell_lng
+
+
+class GridIndex:
+    """
+    Uniform lat/lng bucket grid for radius lookups.
+
+    Kathmandu valley is small enough that a fixed cell size in degrees is
+    accurate to a few percent, which is all the callers need to pick
+    candidates before an exact haversine check.
+    """
+
+    def __init__(self, cell_m=250, ref_lat=27.7172):
+        self.cell_lat = cell_m / METERS_PER_DEG_LAT
+        self.cell_lng = cell_m / (METERS_PER_DEG_LAT * math.cos(math.radians(ref_lat)))
+        self.cells = defaultdict(list)
+        self.size = 0
+
+    def _key(self, lat, lng):
+        return int(math.floor(lat / self.cell_lat)), int(math.floor(lng / self.cell_lng))
+
+    def insert(self, lat, lng, item):
+        self.cells[self._key(lat, lng)].append((lat, lng, item))
+        self.size += 1
+
+    def within(self, lat, lng, radius_m):
+        """Yield (distance_m, item) for every item within radius_m of the point."""
+        ci, cj = self._key(lat, lng)
+        ri = int(math.ceil(radius_m / (self.cell_lat * METERS_PER_DEG_LAT)))
+        rj = int(math.ceil(radius_m / (self.cell_lng * METERS_PER_DEG_LAT * math.cos(math.radians(lat)))))
+        for i in range(ci - ri, ci + ri + 1):
+            for j in range(cj - rj, cj + rj + 1):
+                for plat, plng, item in self.cells.get((i, j), ()):
+                    d = haversine_m(lat, lng, plat, plng)
+                    if d <= radius_m:
+                        yield d, item
+
+    def nearest(self, lat, lng, k=1, max_radius_m=20000):
+        """Return up to k (distance_m, item) pairs sorted by distance."""
+        radius = max(self.cell_lat * METERS_PER_DEG_LAT, 1)
+        found = []
+        while radius <= max_radius_m:
+            found = sorted(self.within(lat, lng, radius), key=lambda p: p[0])
+            if len(found) >= k or len(found) >= self.size:
+                break
+            radius *= 2
+        return found[:k]
@@ -0,0 +1,353 @@
+// ── PAGE NAVIGATION ──
+let mapInitialized = false;
+let map, vehicleLayer, accidentLayer, violationLayer, signalLayer, heatLayer = null;
+const layers = {};
+const showLayers = { vehicles: true, accidents: true, violations: true, signals: true, heatmap: true };
+
+function showPage(page, btn) {
+    document.querySelectorAll('.page').forEach(p => p.classList.remove('active'));
+    document.querySelectorAll('.nav-item').forEach(n => n.classList.remove('active'));
+    document.getElementById('page-' + page).classList.add('active');
+    btn.classList.add('active');
+
+    if (page === 'livemap' && !mapInitialized) {
+        initMap();
+        mapInitialized = true;
+    }
+    if (page === 'livemap' && map) {
+        setTimeout(() => map.invalidateSize(), 100);
+    }
+}
+
+// ── MAP INIT ──
+function initMap() {
+    map = L.map('map', { zoomControl: false }).setView([27.7172, 85.3240], 14);
+    L.control.zoom({ position: 'bottomleft' }).addTo(map);
+
+    L.tileLayer('https://{s}.basemaps.cartocdn.com/dark_nolabels/{z}/{x}/{y}{r}.png', {
+        attribution: '&copy; OpenStreetMap &copy; CARTO', maxZoom: 20
+    }).addTo(map);
+
+    L.tileLayer('https://{s}.basemaps.cartocdn.com/dark_only_labels/{z}/{x}/{y}{r}.png', {
+        maxZoom: 20, pane: 'overlayPane'
+    }).addTo(map);
+
+    vehicleLayer = L.layerGroup().addTo(map);
+    accidentLayer = L.layerGroup().addTo(map);
+    violationLayer = L.layerGroup().addTo(map);
+    signalLayer = L.layerGroup().addTo(map);
+
+    layers.vehicles = vehicleLayer;
+    layers.accidents = accidentLayer;
+    layers.violations = violationLayer;
+    layers.signals = signalLayer;
+}
+
+// ── CONFIG ──
+const severityConfig = {
+    'Minor': { color: '#22d3ee', size: 18, radius: 60 },
+    'Moderate': { color: '#fbbf24', size: 22, radius: 100 },
+    'Severe': { color: '#f97316', size: 26, radius: 150 },
+    'Fatal': { color: '#ef4444', size: 30, radius: 200 }
+};
+
+// ── ICONS ──
+function vehicleIcon(speed) {
+    const c = speed > 80 ? '#ef4444' : speed > 50 ? '#fbbf24' : '#22c55e';
+    return L.divIcon({ html: `<div style="background:${c};width:10px;height:10px;border-radius:50%;border:2px solid white;box-shadow:0 0 8px ${c};"></div>`, className: '', iconSize: [10,10], iconAnchor: [5,5] });
+}
+function accidentMarkerIcon(sev) {
+    const cfg = severityConfig[sev] || severityConfig['Moderate'];
+    const ps = cfg.size + 14;
+    return L.divIcon({ html: `<div style="position:relative;width:${ps}px;height:${ps}px;display:flex;align-items:center;justify-content:center;"><div class="accident-pulse" style="position:absolute;width:${cfg.size}px;height:${cfg.size}px;border-radius:50%;background:${cfg.color};opacity:0.4;"></div><div style="position:relative;background:${cfg.color};width:${cfg.size}px;height:${cfg.size}px;border-radius:50%;border:3px solid white;box-shadow:0 0 14px ${cfg.color};display:flex;align-items:center;justify-content:center;font-size:${Math.floor(cfg.size*0.5)}px;color:white;font-weight:bold;z-index:2;">!</div></div>`, className: '', iconSize: [ps,ps], iconAnchor: [ps/2,ps/2] });
+}
+const defaultViolationIcon = L.divIcon({ html: `<div style="background:#f59e0b;width:14px;height:14px;border-radius:3px;border:2px solid white;box-shadow:0 0 8px #f59e0b;transform:rotate(45deg);"></div>`, className: '', iconSize: [14,14], iconAnchor: [7,7] });
+function signalMarkerIcon(st) {
+    return L.divIcon({ html: `<div style="background:#0d1117;width:12px;height:28px;border-radius:6px;border:2px solid #334155;display:flex;flex-direction:column;align-items:center;justify-content:center;gap:1px;padding:2px;"><div style="width:6px;height:6px;border-radius:50%;background:${st==='Red'?'#ef4444':'#1e293b'};"></div><div style="width:6px;height:6px;border-radius:50%;background:${st==='Yellow'?'#fbbf24':'#1e293b'};"></div><div style="width:6px;height:6px;border-radius:50%;background:${st==='Green'?'#22c55e':'#1e293b'};"></div></div>`, className: '', iconSize: [12,28], iconAnchor: [6,14] });
+}
+
+// ── TABS / TOGGLES ──
+function switchTab(tab, btn) {
+    document.querySelectorAll('.section-tab').forEach(t => t.classList.remove('active'));
+    document.querySelectorAll('.tab-content').forEach(t => t.classList.remove('active'));
+    btn.classList.add('active');
+    document.getElementById('tab-' + tab).classList.add('active');
+}
+function toggleLayer(name, btn) {
+    showLayers[name] = !showLayers[name];
+    btn.classList.toggle('active');
+    if (name === 'heatmap') { if (heatLayer) { showLayers.heatmap ? heatLayer.addTo(map) : map.removeLayer(heatLayer); } }
+    else { showLayers[name] ? layers[name].addTo(map) : map.removeLayer(layers[name]); }
+}
+
+// ── BINARY FEEDS ── (layout documented in core/wire.py)
+const vehicleIds = {};
+const MAX_ID_QUERY = 200;   // ~1.5 KB of ids, well under common request-line limits
+
+async function fetchVehicles() {
+    const buf = await (await fetch('/api/vehicles/?format=bin')).arrayBuffer();
+    const view = new DataView(buf);
+    const n = view.getUint32(4, true);
+    const pks = new Uint32Array(buf, 8, n);
+    const vals = new Float32Array(buf, 8 + 4 * n, 4 * n);
+    const missing = [];
+    for (const pk of pks) if (!(pk in vehicleIds)) missing.push(pk);
+    if (missing.length) {
+        // A handful of new pks fit in the query string; on first load (or a
+        // big fleet change) fetch the whole dictionary instead of a huge URL.
+        const url = missing.length > MAX_ID_QUERY ? '/api/vehicles/ids/' : '/api/vehicles/ids/?ids=' + missing.join(',');
+        Object.assign(vehicleIds, await (await fetch(url)).json());
+    }
+    const data = {};
+    for (let i = 0; i < n; i++) {
+        data[vehicleIds[pks[i]] || pks[i]] = { lat: vals[4*i], lng: vals[4*i+1], speed: vals[4*i+2], heading: vals[4*i+3] };
+    }
+    return data;
+}
+
+async function fetchCongestion() {
+    const buf = await (await fetch('/api/congestion/?format=bin')).arrayBuffer();
+    const n = new DataView(buf).getUint32(4, true);
+    const vals = new Float32Array(buf, 8, 2 * n);
+    const data = [];
+    for (let i = 0; i < n; i++) data.push([vals[2*i], vals[2*i+1], 1]);
+    return data;
+}
+
+// ── DATA FETCH ──
+let cachedAccidents = [], cachedViolations = [], cachedVehicleCount = 0, cachedAvgSpeed = 0;
+
+async function updateVehicles() {
+    try {
+        const data = await fetchVehicles();
+        if (vehicleLayer) vehicleLayer.clearLayers();
+        let count = 0, totalSpeed = 0;
+        for (const [vid, info] of Object.entries(data)) {
+            count++; totalSpeed += info.speed;
+            if (vehicleLayer) {
+                const m = L.marker([info.lat, info.lng], { icon: vehicleIcon(info.speed) });
+                m.bindPopup(`<div class="popup-title">${vid}</div><div class="popup-row">Speed: <b>${info.speed.toFixed(1)} km/h</b></div><div class="popup-row" style="font-family:monospace;color:#999;">${info.lat.toFixed(5)}, ${info.lng.toFixed(5)}</div>`);
+                vehicleLayer.addLayer(m);
+            }
+        }
+        cachedVehicleCount = count;
+        cachedAvgSpeed = count > 0 ? totalSpeed / count : 0;
+
+        // Dashboard stats
+        document.getElementById('dStatVehicles').textContent = count;
+        const slow = Object.values(data).filter(v => v.speed < 20).length;
+        const pct = count > 0 ? Math.round(slow / count * 100) : 0;
+        document.getElementById('dStatVehicleSub').textContent = `+${pct}% congested`;
+        document.getElementById('setVehicles').textContent = count;
+
+        const congLevel = pct > 40 ? 'Critical' : pct > 25 ? 'High' : pct > 10 ? 'Moderate' : 'Low';
+        document.getElementById('dStatCongestion').textContent = congLevel;
+        const congSub = document.getElementById('dStatCongSub');
+        congSub.textContent = congLevel === 'Critical' ? 'Critical Zone' : congLevel === 'High' ? 'Heavy Traffic' : congLevel === 'Moderate' ? 'Normal Flow' : 'Clear Roads';
+        congSub.className = 'stat-sub ' + (congLevel === 'Critical' || congLevel === 'High' ? 'yellow' : 'green');
+
+        document.getElementById('dStatResponse').textContent = (Math.random() * 1.5 + 0.3).toFixed(1) + 's';
+    } catch (e) { console.error('Vehicle error:', e); }
+}
+
+async function updateAccidents() {
+    try {
+        const data = await (await fetch('/api/accidents/')).json();
+        cachedAccidents = data;
+        if (accidentLayer) accidentLayer.clearLayers();
+        const active = data.filter(a => a.status !== 'Resolved');
+
+        document.getElementById('tabAccidentCount').textContent = active.length;
+        document.getElementById('dStatAlerts').textContent = active.length;
+        document.getElementById('dStatAlertSub').textContent = active.length > 0 ? 'Action Required' : 'All Clear';
+
+        // Critical events on dashboard
+        let evHtml = '';
+        active.slice(0, 4).forEach(a => {
+            const dotClass = a.severity === 'Fatal' || a.severity === 'Severe' ? 'red' : 'orange';
+            evHtml += `<div class="event-item">
+                <div class="event-header"><div class="event-vid"><div class="event-dot ${dotClass}"></div><span class="event-id">${a.vehicle}</span></div><span class="event-time">${a.severity === 'Fatal' || a.severity === 'Severe' ? 'COLLISION ALERT' : a.time}</span></div>
+                <div class="event-desc">${a.description}</div>
+                <div class="event-action"><svg viewBox="0 0 24 24"><path d="M19.14,12.94c0.04-0.3,0.06-0.61,0.06-0.94c0-0.32-0.02-0.64-0.07-0.94l2.03-1.58c0.18-0.14,0.23-0.41,0.12-0.61l-1.92-3.32c-0.12-0.22-0.37-0.29-0.59-0.22l-2.39,0.96c-0.5-0.38-1.03-0.7-1.62-0.94L14.4,2.81c-0.04-0.24-0.24-0.41-0.48-0.41h-3.84c-0.24,0-0.43,0.17-0.47,0.41L9.25,5.35C8.66,5.59,8.12,5.92,7.63,6.29L5.24,5.33c-0.22-0.08-0.47,0-0.59,0.22L2.74,8.87C2.62,9.08,2.66,9.34,2.86,9.48l2.03,1.58C4.84,11.36,4.8,11.69,4.8,12s0.02,0.64,0.07,0.94l-2.03,1.58c-0.18,0.14-0.23,0.41-0.12,0.61l1.92,3.32c0.12,0.22,0.37,0.29,0.59,0.22l2.39-0.96c0.5,0.38,1.03,0.7,1.62,0.94l0.36,2.54c0.05,0.24,0.24,0.41,0.48,0.41h3.84c0.24,0,0.44-0.17,0.47-0.41l0.36-2.54c0.59-0.24,1.13-0.56,1.62-0.94l2.39,0.96c0.22,0.08,0.47,0,0.59-0.22l1.92-3.32c0.12-0.22,0.07-0.47-0.12-0.61L19.14,12.94z"/></svg> AUTO-ADJUSTING SIGNALS...</div>
+            </div>`;
+        });
+        document.getElementById('criticalEvents').innerHTML = evHtml || '<div class="events-end">No critical events</div>';
+
+        // Map markers
+        let html = '';
+        data.forEach(a => {
+            const cfg = severityConfig[a.severity] || severityConfig['Moderate'];
+            if (a.status !== 'Resolved' && accidentLayer) {
+                const m = L.marker([a.lat, a.lng], { icon: accidentMarkerIcon(a.severity) });
+                m.bindPopup(`<div><span class="popup-badge" style="background:${cfg.color};color:white;">${a.severity}</span> <b>Accident</b><div class="popup-row"><b>${a.road_name}</b></div><div class="popup-row" style="font-style:italic;color:#777;">${a.description}</div><div class="popup-row">Vehicle: ${a.vehicle} | Injuries: ${a.injuries}</div><div class="popup-row">Time: ${a.time}</div><div class="popup-row" style="font-family:monospace;color:#999;">${a.lat.toFixed(5)}, ${a.lng.toFixed(5)}</div></div>`);
+                accidentLayer.addLayer(m);
+                accidentLayer.addLayer(L.circle([a.lat, a.lng], { radius: cfg.radius, color: cfg.color, fillColor: cfg.color, fillOpacity: 0.06, weight: 1, dashArray: '6,4' }));
+            }
+            if (a.status === 'Resolved') return;
+            const isPending = a.status === 'Pending';
+            const sevClass = 'badge-' + a.severity.toLowerCase();
+            const statusClass = isPending ? 'badge-pending' : 'badge-dispatched';
+            html += `<div class="accident-card" style="border-left-color:${cfg.color};"><div class="card-header"><div class="left"><span class="badge ${sevClass}">${a.severity}</span><span class="vehicle-id">${a.vehicle}</span></div><span style="font-size:11px;color:#334155;">${a.time}</span></div><div class="location-row"><span class="road-badge"><svg viewBox="0 0 24 24"><path d="M12 2C8.13 2 5 5.13 5 9c0 5.25 7 13 7 13s7-7.75 7-13c0-3.87-3.13-7-7-7zm0 9.5c-1.38 0-2.5-1.12-2.5-2.5s1.12-2.5 2.5-2.5 2.5 1.12 2.5 2.5-1.12 2.5-2.5 2.5z"/></svg> ${a.road_name}</span>${a.injuries > 0 ? `<span class="injuries-badge">${a.injuries} injured</span>` : ''}</div><div class="description-text">${a.description}</div><div class="coords-text">${a.lat.toFixed(5)}, ${a.lng.toFixed(5)}</div><p><span class="badge ${statusClass}">${a.status}</span></p><div class="card-actions"><button class="btn btn-locate" onclick="locateAccident(${a.lat},${a.lng},'${a.vehicle}')">Locate</button><button class="btn btn-dispatch" onclick="dispatchUnit(${a.id},'Ambulance',this)">Ambulance</button><button class="btn btn-dispatch" onclick="dispatchUnit(${a.id},'Police',this)">Police</button><button class="btn btn-dispatch" onclick="dispatchUnit(${a.id},'Fire',this)">Fire</button><button class="btn btn-dispatch" onclick="dispatchUnit(${a.id},'Traffic Police',this)">Traffic</button><button class="btn btn-dispatch" onclick="dispatchUnit(${a.id},'Tow Truck',this)">Tow Truck</button><button class="btn btn-dispatch" onclick="dispatchUnit(${a.id},'Rescue Team',this)">Rescue</button><button class="btn btn-resolve" onclick="resolveAccident(${a.id})">Resolve</button></div></div>`;
+        });
+        document.getElementById('accidentList').innerHTML = html || '<div class="empty-state">No accidents reported</div>';
+
+        // Incidents page
+        let incHtml = '';
+        data.filter(a => a.status !== 'Resolved').forEach(a => {
+            const cfg = severityConfig[a.severity] || severityConfig['Moderate'];
+            incHtml += `<div class="accident-card" style="border-left-color:${cfg.color};"><div class="card-header"><div class="left"><span class="badge badge-${a.severity.toLowerCase()}">${a.severity}</span><span class="vehicle-id">${a.vehicle}</span></div><span style="font-size:11px;color:#334155;">${a.time}</span></div><div class="location-row"><span class="road-badge"><svg viewBox="0 0 24 24"><path d="M12 2C8.13 2 5 5.13 5 9c0 5.25 7 13 7 13s7-7.75 7-13c0-3.87-3.13-7-7-7zm0 9.5c-1.38 0-2.5-1.12-2.5-2.5s1.12-2.5 2.5-2.5 2.5 1.12 2.5 2.5-1.12 2.5-2.5 2.5z"/></svg> ${a.road_name}</span>${a.injuries > 0 ? `<span class="injuries-badge">${a.injuries} injured</span>` : ''}</div><div class="description-text">${a.description}</div><div class="card-actions"><button class="btn btn-dispatch" onclick="dispatchUnit(${a.id},'Ambulance',this)">Ambulance</button><button class="btn btn-dispatch" onclick="dispatchUnit(${a.id},'Police',this)">Police</button><button class="btn btn-resolve" onclick="resolveAccident(${a.id})">Resolve</button></div></div>`;
+        });
+        document.getElementById('incidentsGrid').innerHTML = incHtml || '<div class="empty-state">No active incidents</div>';
+    } catch (e) { console.error('Accident error:', e); }
+}
+
+async function updateViolations() {
+    try {
+        const data = await (await fetch('/api/violations/')).json();
+        cachedViolations = data;
+        if (violationLayer) violationLayer.clearLayers();
+        document.getElementById('tabViolationCount').textContent = data.length;
+        let html = '';
+        data.forEach(v => {
+            if (violationLayer) {
+                const m = L.marker([v.lat, v.lng], { icon: defaultViolationIcon });
+                m.bindPopup(`<div class="popup-title">${v.violation_type}</div><div class="popup-row">Vehicle: ${v.vehicle}</div><div class="popup-row">Speed: ${v.speed} km/h | Lane: ${v.lane}</div><div class="popup-row">Fine: Rs. ${v.fine}</div><a href="/static/videos/${v.video}" target="_blank" style="font-size:12px;">View Clip</a>`);
+                violationLayer.addLayer(m);
+            }
+            const typeKey = v.violation_type.replace(/\s+/g, '').toLowerCase();
+            html += `<div class="violation-card"><div class="card-header"><div style="display:flex;align-items:center;gap:8px;"><span class="badge badge-${typeKey}">${v.violation_type}</span><span class="vehicle-id">${v.vehicle}</span></div><span style="font-size:11px;color:#334155;">${v.time}</span></div><p>Speed: ${v.speed} km/h &middot; Lane: ${v.lane}</p><div style="display:flex;align-items:center;gap:8px;margin-top:4px;"><span class="fine-badge">Fine: Rs. ${v.fine}</span><a class="video-link" href="/static/videos/${v.video}" target="_blank">View Clip</a></div></div>`;
+        });
+        document.getElementById('violationList').innerHTML = html || '<div class="empty-state">No violations recorded</div>';
+    } catch (e) { console.error('Violation error:', e); }
+}
+
+async function updateCongestion() {
+    try {
+        const data = await fetchCongestion();
+        if (heatLayer && map) map.removeLayer(heatLayer);
+        if (data.length > 0 && map) {
+            heatLayer = L.heatLayer(data, { radius: 30, blur: 20, maxZoom: 17, gradient: { 0.2: '#22c55e', 0.4: '#fbbf24', 0.6: '#f97316', 0.8: '#ef4444', 1.0: '#dc2626' } });
+            if (showLayers.heatmap) heatLayer.addTo(map);
+        }
+    } catch (e) { console.error('Congestion error:', e); }
+}
+
+async function updateSignals() {
+    try {
+        const data = await (await fetch('/api/signals/')).json();
+        if (signalLayer) {
+            signalLayer.clearLayers();
+            data.forEach(s => {
+                const m = L.marker([s.lat, s.lng], { icon: signalMarkerIcon(s.state) });
+                m.bindPopup(`<div class="popup-title">${s.name}</div><div class="popup-row">State: <b style="color:${s.state==='Red'?'#ef4444':s.state==='Yellow'?'#fbbf24':'#22c55e'}">${s.state}</b></div>`);
+                signalLayer.addLayer(m);
+            });
+        }
+    } catch (e) { console.error('Signal error:', e); }
+}
+
+// ── ACTIONS ──
+async function dispatchUnit(id, unit, btn) {
+    try {
+        const data = await (await fetch('/api/dispatch/', { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify({ accident_id: id, unit: unit }) })).json();
+        if (data.success) { btn.textContent = unit + ' Sent'; btn.classList.add('sent'); btn.disabled = true; setTimeout(updateAccidents, 500); }
+    } catch (e) { console.error('Dispatch error:', e); }
+}
+async function resolveAccident(id) {
+    try {
+        const data = await (await fetch('/api/resolve/', { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify({ accident_id: id }) })).json();
+        if (data.success) setTimeout(updateAccidents, 300);
+    } catch (e) { console.error('Resolve error:', e); }
+}
+function locateAccident(lat, lng, vehicle) {
+    showPage('livemap', document.querySelectorAll('.nav-item')[1]);
+    setTimeout(() => {
+        if (map) {
+            map.invalidateSize();
+            map.flyTo([lat, lng], 17, { duration: 1 });
+            const icon = L.divIcon({ html: `<div style="position:relative;"><div style="width:60px;height:60px;border:3px solid #ef4444;border-radius:50%;animation:pulse-ring 1s ease-out 4;"></div><div style="position:absolute;top:-22px;left:50%;transform:translateX(-50%);background:#ef4444;color:white;padding:3px 10px;border-radius:6px;font-size:11px;font-weight:700;white-space:nowrap;">${vehicle}</div></div>`, className: '', iconSize: [60,60], iconAnchor: [30,30] });
+            const m = L.marker([lat, lng], { icon: icon }).addTo(map);
+            setTimeout(() => map.removeLayer(m), 5000);
+        }
+    }, 200);
+}
+
+// ── DENSITY CHART ──
+const densityHistory = [];
+function drawDensityChart() {
+    const canvas = document.getElementById('densityChart');
+    if (!canvas) return;
+    const ctx = canvas.getContext('2d');
+    const w = canvas.width = canvas.parentElement.offsetWidth;
+    const h = canvas.height = canvas.parentElement.offsetHeight;
+    ctx.clearRect(0, 0, w, h);
+
+    // Grid lines
+    ctx.strokeStyle = '#1e293b';
+    ctx.lineWidth = 0.5;
+    for (let i = 0; i <= 4; i++) {
+        const y = (h / 4) * i;
+        ctx.beginPath(); ctx.moveTo(0, y); ctx.lineTo(w, y); ctx.stroke();
+    }
+
+    if (densityHistory.length < 2) return;
+
+    // Draw area
+    const step = w / (densityHistory.length - 1);
+    ctx.beginPath();
+    ctx.moveTo(0, h);
+    densityHistory.forEach((v, i) => {
+        const x = i * step;
+        const y = h - (v / 100) * h;
+        if (i === 0) ctx.lineTo(x, y);
+        else {
+            const px = (i - 1) * step;
+            const py = h - (densityHistory[i-1] / 100) * h;
+            const cx = (px + x) / 2;
+            ctx.bezierCurveTo(cx, py, cx, y, x, y);
+        }
+    });
+    ctx.lineTo(w, h);
+    ctx.closePath();
+
+    const grad = ctx.createLinearGradient(0, 0, 0, h);
+    grad.addColorStop(0, 'rgba(6,182,212,0.3)');
+    grad.addColorStop(1, 'rgba(6,182,212,0.01)');
+    ctx.fillStyle = grad;
+    ctx.fill();
+
+    // Draw line
+    ctx.beginPath();
+    densityHistory.forEach((v, i) => {
+        const x = i * step;
+        const y = h - (v / 100) * h;
+        if (i === 0) ctx.moveTo(x, y);
+        else {
+            const px = (i - 1) * step;
+            const py = h - (densityHistory[i-1] / 100) * h;
+            const cx = (px + x) / 2;
+            ctx.bezierCurveTo(cx, py, cx, y, x, y);
+        }
+    });
+    ctx.strokeStyle = '#22d3ee';
+    ctx.lineWidth = 2;
+    ctx.stroke();
+}
+
+// ── REFRESH ──
+function refreshAll() {
+    updateVehicles();
+    updateAccidents();
+    updateViolations();
+    updateCongestion();
+    updateSignals();
+
+    // Update density chart
+    const density = cachedVehicleCount > 0 ? Math.min(100, Math.round((cachedVehicleCount - cachedAvgSpeed * 0.5) / cachedVehicleCount * 100 + Math.random() * 10)) : 30;
+    densityHistory.push(Math.max(10, Math.min(95, density)));
+    if (densityHistory.length > 50) densityHistory.shift();
+    drawDensityChart();
+}
+
+refreshAll();
+setInterval(refreshAll, 2000);
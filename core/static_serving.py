@@ -0,0 +1,44 @@
+"""
+Static asset serving for deployments without a separate web server.
+
+Serves collectstatic output from STATIC_ROOT, preferring the .br/.gz copy
+written by CompressedManifestStaticFilesStorage when the client accepts
+it. Content-hashed names never change, so they get a one-year immutable
+Cache-Control; anything else is revalidated after a minute.
+"""
+
+import mimetypes
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, Http404
+
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def serve(request, path):
+    root = Path(settings.STATIC_ROOT).resolve()
+    full = (root / path).resolve()
+    if root not in full.parents or not full.is_file():
+        raise Http404(path)
+
+    content_type, _ = mimetypes.guess_type(full.name)
+    accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    encoding = None
+    for name, suffix in ENCODINGS:
+        compressed = full.with_name(full.name + suffix)
+        if name in accepted and compressed.is_file():
+            full, encoding = compressed, name
+            break
+
+    response = FileResponse(open(full, 'rb'), content_type=content_type or 'application/octet-stream')
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Vary'] = 'Accept-Encoding'
+    if HASHED_NAME.search(path):
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response['Cache-Control'] = 'public, max-age=60'
+    return response
@@ -0,0 +1,38 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.map')
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Content-hashed static files, each text asset also written as .gz (and
+    .br when the brotli package is installed) so core.static_serving can
+    hand out the precompressed copy without compressing per request.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for hashed in set(self.hashed_files.values()):
+            if not hashed.endswith(COMPRESSIBLE) or not self.exists(hashed):
+                continue
+            with self.open(hashed) as f:
+                data = f.read()
+            self._write(hashed + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                self._write(hashed + '.br', brotli.compress(data))
+            yield hashed, hashed + '.gz', True
+
+    def _write(self, name, data):
+        if self.exists(name):
+            self.delete(name)
+        with open(self.path(name), 'wb') as f:
+            f.write(data)
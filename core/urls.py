@@ -4,11 +4,22 @@ from . import views
 urlpatterns = [
     path('stats/', views.dashboard_stats),
     path('vehicles/', views.vehicles),
+    path('vehicles/ids/', views.vehicle_ids),
+    path('events/', views.events),
     path('update/', views.update_vehicle),
+    path('ingest/metrics/', views.ingest_metrics),
     path('accidents/', views.accidents),
     path('violations/', views.violations),
     path('congestion/', views.congestion),
     path('signals/', views.signals),
     path('dispatch/', views.dispatch),
+    path('dispatch/bulk/', views.bulk_dispatch),
+    path('dispatch/units/', views.dispatched_units),
+    path('dispatch/recommend/', views.recommend),
+    path('analytics/hotspots/', views.analytics_hotspots),
+    path('analytics/profile/', views.analytics_profile),
+    path('export/<str:kind>/', views.export_records),
+    path('units/', views.responder_units),
+    path('units/update/', views.update_unit),
     path('resolve/', views.resolve_accident),
 ]
@@ -1,20 +1,36 @@
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect
 from django.views.decorators.csrf import csrf_exempt
+from django.db import IntegrityError, transaction
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.contrib.auth.hashers import make_password, check_password
-from .models import Vehicle, Accident, Violation, TrafficSignal, Operator
+from .models import Vehicle, Accident, Violation, TrafficSignal, Operator, DispatchAssignment, ResponderUnit
+from .dispatch import dispatch_units, dispatch_responder, resolve, status_display, units_by_accident, UNITS
+from .routing import recommend_units, get_matrix
+from .analytics import hotspots, hourly_profile
+from .export import EXPORTS, FORMATS, export_stream, export_filename
+from . import wire
+from .live_state import vehicle_snapshot, get_backend, publish_event, EVENTS_CHANNEL
+from .ingest import ingest_queue, priority
+from .auth import (
+    operator_status, is_active_operator, invalidate_operator,
+    login_blocked, record_login_failure, clear_login_failures, client_ip,
+)
+import math
+import time
 import json
 
 
+@priority
 def dashboard_stats(request):
-    total_vehicles = Vehicle.objects.count()
+    speeds = [v["speed"] for v in vehicle_snapshot().values()]
+    total_vehicles = len(speeds)
     active_accidents = Accident.objects.filter(status="Pending").count()
     total_accidents = Accident.objects.count()
     total_violations = Violation.objects.count()
-    speeds = Vehicle.objects.values_list('speed', flat=True)
     avg_speed = sum(speeds) / len(speeds) if speeds else 0
-    overspeeding = Vehicle.objects.filter(speed__gt=80).count()
+    overspeeding = sum(1 for s in speeds if s > 80)
     severe_accidents = Accident.objects.filter(severity__in=['Severe', 'Fatal'], status='Pending').count()
 
     return JsonResponse({
@@ -28,21 +44,29 @@ def dashboard_stats(request):
     })
 
 
+@priority
 def vehicles(request):
+    snapshot = vehicle_snapshot()
+    if wire.wants_binary(request, wire.VEHICLES_TYPE):
+        rows = ((v["pk"], v["lat"], v["lng"], v["speed"], v["heading"]) for v in snapshot.values())
+        return HttpResponse(wire.encode_vehicles(rows), content_type=wire.VEHICLES_TYPE)
     data = {}
-    for v in Vehicle.objects.all():
-        data[v.vehicle_id] = {
-            "lat": v.lat,
-            "lng": v.lng,
-            "speed": v.speed,
-            "heading": v.heading,
+    for vid, v in snapshot.items():
+        data[vid] = {
+            "lat": v["lat"],
+            "lng": v["lng"],
+            "speed": v["speed"],
+            "heading": v["heading"],
         }
     return JsonResponse(data)
 
 
+@priority
 def accidents(request):
     data = []
-    for a in Accident.objects.all():
+    rows = list(Accident.objects.all())
+    units = units_by_accident([a.id for a in rows])
+    for a in rows:
         data.append({
             "id": a.id,
             "vehicle": a.vehicle,
@@ -54,11 +78,13 @@ def accidents(request):
             "injuries": a.injuries,
             "time": a.time.strftime("%H:%M:%S"),
             "date": a.time.strftime("%Y-%m-%d"),
-            "status": a.status,
+            "status": status_display(a.status, units.get(a.id, [])),
+            "units": units.get(a.id, []),
         })
     return JsonResponse(data, safe=False)
 
 
+@priority
 def violations(request):
     data = []
     for v in Violation.objects.all():
@@ -76,13 +102,54 @@ def violations(request):
     return JsonResponse(data, safe=False)
 
 
+def events(request):
+    """Server-sent event feed of new accidents/violations, dispatches and resolutions from every node."""
+    subscription = get_backend().subscribe([EVENTS_CHANNEL])
+
+    def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                message = subscription.get(timeout=15)
+                if message is None:
+                    yield ": keepalive\n\n"
+                    continue
+                _, event = message
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def vehicle_ids(request):
+    """pk -> vehicle_id dictionary for decoding the binary vehicle feed."""
+    qs = Vehicle.objects.order_by()
+    if request.GET.get('ids'):
+        try:
+            ids = [int(i) for i in request.GET['ids'].split(',') if i.strip()]
+        except ValueError:
+            return JsonResponse({"success": False, "message": "ids must be comma-separated integers"}, status=400)
+        qs = qs.filter(id__in=ids)
+    return JsonResponse({str(pk): vid for pk, vid in qs.values_list('id', 'vehicle_id')})
+
+
+@priority
 def congestion(request):
+    slow = [v for v in vehicle_snapshot().values() if v["speed"] < 20]
+    if wire.wants_binary(request, wire.CONGESTION_TYPE):
+        points = ((v["lat"], v["lng"]) for v in slow)
+        return HttpResponse(wire.encode_congestion(points), content_type=wire.CONGESTION_TYPE)
     data = []
-    for v in Vehicle.objects.filter(speed__lt=20):
-        data.append([v.lat, v.lng, 1])
+    for v in slow:
+        data.append([v["lat"], v["lng"], 1])
     return JsonResponse(data, safe=False)
 
 
+@priority
 def signals(request):
     data = []
     for s in TrafficSignal.objects.all():
@@ -93,65 +160,297 @@ def signals(request):
             "lng": s.lng,
             "state": s.state,
             "cycle_time": s.cycle_time,
+            "green_split": s.green_split,
         })
     return JsonResponse(data, safe=False)
 
 
+def _accident_id(value):
+    """Parse an accident id from request input; None if it isn't a positive integer."""
+    try:
+        accident_id = int(value)
+    except (TypeError, ValueError):
+        return None
+    return accident_id if accident_id > 0 else None
+
+
 @csrf_exempt
+@priority
 def dispatch(request):
     if request.method == "POST":
         body = json.loads(request.body)
-        accident_id = body.get("accident_id")
+        accident_id = _accident_id(body.get("accident_id"))
+        if accident_id is None:
+            return JsonResponse({"success": False, "message": "Accident not found"})
         unit = body.get("unit")
+        responder_id = body.get("responder_id")
+        operator_id = request.session.get('operator_id', '')
         try:
-            a = Accident.objects.get(id=accident_id)
-            # Append new unit to existing dispatched units
-            if a.status.startswith("Dispatched"):
-                existing = a.status.replace("Dispatched (", "").rstrip(")")
-                units = [u.strip() for u in existing.split(",")]
-                if unit not in units:
-                    units.append(unit)
-                a.status = f"Dispatched ({', '.join(units)})"
+            if responder_id:
+                status = dispatch_responder(accident_id, responder_id, operator_id)
             else:
-                a.status = f"Dispatched ({unit})"
-            a.save()
-            return JsonResponse({"success": True, "status": a.status})
+                status = dispatch_units([(accident_id, [unit])], operator_id)[accident_id]
+            publish_event('dispatch', id=accident_id, status=status)
+            return JsonResponse({"success": True, "status": status})
         except Accident.DoesNotExist:
             return JsonResponse({"success": False, "message": "Accident not found"})
+        except ResponderUnit.DoesNotExist:
+            return JsonResponse({"success": False, "message": "Unit not found"})
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)})
     return JsonResponse({"success": False, "message": "POST required"})
 
 
 @csrf_exempt
+@priority
+def bulk_dispatch(request):
+    """
+    Dispatch several units to one or more accidents atomically.
+
+    Body: {"dispatches": [{"accident_id": 1, "units": ["Ambulance", "Fire"]}, ...]}
+    """
+    if request.method == "POST":
+        body = json.loads(request.body)
+        try:
+            dispatches = [(_accident_id(d["accident_id"]), d.get("units", [])) for d in body.get("dispatches", [])]
+            if any(accident_id is None for accident_id, _ in dispatches):
+                return JsonResponse({"success": False, "message": "Accident not found"})
+            result = dispatch_units(dispatches, request.session.get('operator_id', ''))
+            for accident_id, status in result.items():
+                publish_event('dispatch', id=accident_id, status=status)
+            return JsonResponse({"success": True, "status": {str(k): v for k, v in result.items()}})
+        except (KeyError, TypeError):
+            return JsonResponse({"success": False, "message": "Invalid dispatch list"})
+        except Accident.DoesNotExist:
+            return JsonResponse({"success": False, "message": "Accident not found"})
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)})
+    return JsonResponse({"success": False, "message": "POST required"})
+
+
+@priority
+def dispatched_units(request):
+    qs = DispatchAssignment.objects.select_related('accident')
+    if request.GET.get('unit'):
+        qs = qs.filter(unit=request.GET['unit'])
+    qs = qs.filter(state=request.GET.get('state', 'Dispatched'))
+    data = []
+    for d in qs:
+        data.append({
+            "accident_id": d.accident_id,
+            "unit": d.unit,
+            "state": d.state,
+            "severity": d.accident.severity,
+            "road_name": d.accident.road_name,
+            "dispatched_by": d.dispatched_by,
+            "dispatched_at": d.dispatched_at.strftime("%H:%M:%S"),
+        })
+    return JsonResponse(data, safe=False)
+
+
+@priority
+def recommend(request):
+    """Nearest available responder units for an accident, ranked by road ETA."""
+    started = time.perf_counter()
+    try:
+        a = Accident.objects.get(id=request.GET.get("accident_id"))
+    except (Accident.DoesNotExist, ValueError):
+        return JsonResponse({"success": False, "message": "Accident not found"})
+    unit_type = request.GET.get("unit") or None
+    try:
+        k = _int_param(request, "k", 5, maximum=50)
+    except ValueError as e:
+        return JsonResponse({"success": False, "message": str(e)}, status=400)
+    units = recommend_units(a.lat, a.lng, unit_type, k)
+    return JsonResponse({
+        "success": True,
+        "accident_id": a.id,
+        "units": units,
+        "matrix_age_s": round(time.monotonic() - get_matrix()["built_at"], 1),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    })
+
+
+def _int_param(request, name, default, maximum=None):
+    """Positive integer query parameter capped at `maximum`; ValueError if malformed."""
+    raw = request.GET.get(name)
+    if not raw:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        value = 0
+    if value < 1:
+        raise ValueError(f"{name} must be a positive integer")
+    return min(value, maximum) if maximum else value
+
+
+def _analytics_params(request):
+    kind = request.GET.get("kind", "accident").capitalize()
+    if kind not in ("Accident", "Violation"):
+        kind = "Accident"
+    return kind, _int_param(request, "days", None), request.GET.get("category") or None
+
+
+def analytics_hotspots(request):
+    try:
+        kind, days, category = _analytics_params(request)
+        limit = _int_param(request, "limit", 10, maximum=100)
+    except ValueError as e:
+        return JsonResponse({"success": False, "message": str(e)}, status=400)
+    by = "road" if request.GET.get("by") == "road" else "cell"
+    return JsonResponse(hotspots(kind, by, days, category, limit), safe=False)
+
+
+def analytics_profile(request):
+    try:
+        kind, days, category = _analytics_params(request)
+    except ValueError as e:
+        return JsonResponse({"success": False, "message": str(e)}, status=400)
+    return JsonResponse(hourly_profile(kind, days, category))
+
+
+def export_records(request, kind):
+    """Stream accidents/violations as CSV, Parquet or Arrow; operators only."""
+    if not is_active_operator(request.session.get('operator_id')):
+        return JsonResponse({"success": False, "message": "Login required"}, status=403)
+    fmt = request.GET.get("format", "csv")
+    if kind not in EXPORTS or fmt not in FORMATS:
+        return JsonResponse({"success": False, "message": "Unknown export"}, status=404)
+    dates = {}
+    for name in ("start", "end"):
+        raw = request.GET.get(name)
+        try:
+            dates[name] = parse_date(raw) if raw else None
+        except ValueError:
+            dates[name] = None
+        if raw and dates[name] is None:
+            return JsonResponse({"success": False, "message": f"Invalid {name} date, use YYYY-MM-DD"}, status=400)
+    start, end = dates["start"], dates["end"]
+    try:
+        chunks = export_stream(kind, fmt, start, end)
+    except ImportError as e:
+        return JsonResponse({"success": False, "message": str(e)}, status=501)
+    response = StreamingHttpResponse(chunks, content_type=FORMATS[fmt][0])
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(kind, fmt, start, end)}"'
+    return response
+
+
+def responder_units(request):
+    data = {}
+    for u in ResponderUnit.objects.all():
+        data[u.unit_id] = {
+            "unit_type": u.unit_type,
+            "lat": u.lat,
+            "lng": u.lng,
+            "status": u.status,
+        }
+    return JsonResponse(data)
+
+
+@csrf_exempt
+def update_unit(request):
+    """
+    Report a responder unit's position (and optionally Available/Offline).
+
+    Position is written with a plain UPDATE and status only with a
+    conditional one, so a report racing a dispatch can't flip a Committed
+    unit back to Available.
+    """
+    if request.method == "POST":
+        body = json.loads(request.body)
+        uid = body.get("unit_id")
+        unit_type = body.get("unit_type")
+        if not uid:
+            return JsonResponse({"success": False, "message": "unit_id required"})
+        position = {f: body[f] for f in ("lat", "lng") if body.get(f) is not None}
+        unit = ResponderUnit.objects.filter(unit_id=uid)
+        if not unit.update(last_updated=timezone.now(), **position):
+            if unit_type not in UNITS:
+                return JsonResponse({"success": False, "message": "Valid unit_type required"})
+            try:
+                with transaction.atomic():
+                    ResponderUnit.objects.create(unit_id=uid, unit_type=unit_type, **position)
+            except IntegrityError:
+                unit.update(last_updated=timezone.now(), **position)
+        if body.get("status") in ("Available", "Offline"):
+            unit.exclude(status="Committed").update(status=body["status"])
+        return JsonResponse({"success": True})
+    return JsonResponse({"success": False, "message": "POST required"})
+
+
+@csrf_exempt
+@priority
 def resolve_accident(request):
     if request.method == "POST":
         body = json.loads(request.body)
-        accident_id = body.get("accident_id")
+        accident_id = _accident_id(body.get("accident_id"))
+        if accident_id is None:
+            return JsonResponse({"success": False, "message": "Accident not found"})
         try:
-            a = Accident.objects.get(id=accident_id)
-            a.status = "Resolved"
-            a.resolved_at = timezone.now()
-            a.save()
+            resolve(accident_id)
+            publish_event('resolve', id=accident_id)
             return JsonResponse({"success": True})
         except Accident.DoesNotExist:
             return JsonResponse({"success": False, "message": "Accident not found"})
     return JsonResponse({"success": False, "message": "POST required"})
 
 
+def _shed(shed, total):
+    response = JsonResponse({
+        "success": False,
+        "message": "Ingest queue full, retry later",
+        "queued": total - shed,
+        "shed": shed,
+    }, status=429)
+    response['Retry-After'] = str(ingest_queue.retry_after())
+    return response
+
+
+def _float_field(body, name):
+    """Finite float from a JSON body, None when absent; ValueError if malformed."""
+    raw = body.get(name)
+    if raw is None:
+        return None
+    try:
+        value = float(raw)
+    except (TypeError, ValueError):
+        value = math.nan
+    if not math.isfinite(value):
+        raise ValueError(f"{name} must be a number")
+    return value
+
+
 @csrf_exempt
 def update_vehicle(request):
+    if request.method == "POST" and request.content_type == wire.UPDATE_TYPE:
+        try:
+            updates = wire.decode_updates(request.body)
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)}, status=400)
+        shed = ingest_queue.offer(updates)
+        if shed:
+            return _shed(shed, len(updates))
+        return JsonResponse({"success": True, "queued": len(updates)})
     if request.method == "POST":
         body = json.loads(request.body)
         vid = body.get("vehicle_id")
-        v, _ = Vehicle.objects.get_or_create(vehicle_id=vid)
-        v.lat = body.get("lat", v.lat)
-        v.lng = body.get("lng", v.lng)
-        v.speed = body.get("speed", v.speed)
-        v.heading = body.get("heading", v.heading)
-        v.save()
+        if not vid:
+            return JsonResponse({"success": False, "message": "vehicle_id required"}, status=400)
+        try:
+            values = [_float_field(body, name) for name in ("lat", "lng", "speed", "heading")]
+        except ValueError as e:
+            return JsonResponse({"success": False, "message": str(e)}, status=400)
+        if ingest_queue.offer([(vid, *values)]):
+            return _shed(1, 1)
         return JsonResponse({"success": True})
     return JsonResponse({"success": False, "message": "POST required"})
 
 
+def ingest_metrics(request):
+    return JsonResponse(ingest_queue.metrics())
+
+
 def operator_login(request):
     if request.session.get('operator_id'):
         return redirect('command_center')
@@ -161,19 +460,26 @@ def operator_login(request):
     if request.method == "POST":
         op_id = request.POST.get('operator_id', '').strip()
         password = request.POST.get('password', '').strip()
-        try:
-            operator = Operator.objects.get(operator_id=op_id, is_active=True)
-            if check_password(password, operator.password):
-                request.session['operator_id'] = operator.operator_id
-                request.session['operator_name'] = operator.name
-                request.session['operator_role'] = operator.role
-                operator.last_login = timezone.now()
-                operator.save()
-                return redirect('command_center')
-            else:
-                error = "Invalid password. Please try again."
-        except Operator.DoesNotExist:
-            error = "Operator ID not found."
+        ip = client_ip(request)
+        if login_blocked(op_id, ip):
+            error = "Too many failed attempts. Please wait a few minutes and try again."
+        else:
+            try:
+                operator = Operator.objects.only('operator_id', 'name', 'role', 'password').get(
+                    operator_id=op_id, is_active=True)
+                if check_password(password, operator.password):
+                    clear_login_failures(op_id)
+                    request.session['operator_id'] = operator.operator_id
+                    request.session['operator_name'] = operator.name
+                    request.session['operator_role'] = operator.role
+                    Operator.objects.filter(pk=operator.pk).update(last_login=timezone.now())
+                    return redirect('command_center')
+                else:
+                    record_login_failure(op_id, ip)
+                    error = "Invalid password. Please try again."
+            except Operator.DoesNotExist:
+                record_login_failure(op_id, ip)
+                error = "Operator ID not found."
 
     if request.GET.get('registered'):
         reg_success = "Registration successful! You can now log in."
@@ -213,6 +519,7 @@ def operator_register(request):
                 password=make_password(password),
                 role=role,
             )
+            invalidate_operator(op_id)
             return redirect('/login/?registered=1')
 
     return render(request, 'login.html', {
@@ -229,8 +536,12 @@ def operator_logout(request):
 def command_center(request):
     if not request.session.get('operator_id'):
         return redirect('login')
+    status = operator_status(request.session['operator_id'])
+    if not (status and status['is_active']):
+        request.session.flush()
+        return redirect('login')
     return render(request, 'map.html', {
-        'operator_name': request.session.get('operator_name', ''),
-        'operator_role': request.session.get('operator_role', ''),
+        'operator_name': status['name'],
+        'operator_role': status['role'],
         'operator_id': request.session.get('operator_id', ''),
     })
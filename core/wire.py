@@ -0,0 +1,93 @@
+"""
+Compact binary encodings for the high-volume live feeds.
+
+All values are little-endian and every section starts 4-byte aligned, so
+browsers can view them directly as Uint32Array/Float32Array.
+
+Vehicles  (application/x-kvsts-vehicles)
+    b'KVV1' | uint32 n | uint32 ids[n] | float32 [lat, lng, speed, heading] * n
+    `ids` are Vehicle primary keys; the pk -> vehicle_id dictionary is
+    fetched once from /api/vehicles/ids/ and again only for unseen pks.
+
+Congestion  (application/x-kvsts-congestion)
+    b'KVC1' | uint32 n | float32 [lat, lng] * n      (intensity is always 1)
+
+Position updates  (application/x-kvsts-update, request body)
+    b'KVU1' | uint32 n | n x (uint8 len | vehicle_id utf-8 | float32 lat, lng, speed, heading)
+
+float32 keeps lat/lng to roughly 0.2 m around Kathmandu.
+"""
+
+import math
+import struct
+import sys
+from array import array
+
+VEHICLES_TYPE = 'application/x-kvsts-vehicles'
+CONGESTION_TYPE = 'application/x-kvsts-congestion'
+UPDATE_TYPE = 'application/x-kvsts-update'
+
+_HEADER = struct.Struct('<4sI')
+_FLOATS4 = struct.Struct('<4f')
+
+
+def wants_binary(request, content_type):
+    """True if the client asked for the binary form via ?format=bin or Accept."""
+    if request.GET.get('format') == 'bin':
+        return True
+    return content_type in request.META.get('HTTP_ACCEPT', '')
+
+
+def _le(arr):
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def encode_vehicles(rows):
+    """rows: iterable of (pk, lat, lng, speed, heading)."""
+    ids = array('I')
+    values = array('f')
+    for pk, lat, lng, speed, heading in rows:
+        ids.append(pk)
+        values.extend((lat, lng, speed, heading))
+    return _HEADER.pack(b'KVV1', len(ids)) + _le(ids) + _le(values)
+
+
+def encode_congestion(points):
+    """points: iterable of (lat, lng)."""
+    values = array('f')
+    for lat, lng in points:
+        values.extend((lat, lng))
+    return _HEADER.pack(b'KVC1', len(values) // 2) + _le(values)
+
+
+def encode_updates(updates):
+    """updates: iterable of (vehicle_id, lat, lng, speed, heading). Used by the simulator."""
+    parts = []
+    for vid, lat, lng, speed, heading in updates:
+        raw = vid.encode()
+        parts.append(bytes([len(raw)]) + raw + _FLOATS4.pack(lat, lng, speed, heading))
+    return _HEADER.pack(b'KVU1', len(parts)) + b''.join(parts)
+
+
+def decode_updates(body):
+    """Inverse of encode_updates; raises ValueError on a malformed body."""
+    try:
+        magic, count = _HEADER.unpack_from(body, 0)
+        if magic != b'KVU1':
+            raise ValueError("Bad update payload")
+        offset = _HEADER.size
+        updates = []
+        for _ in range(count):
+            n = body[offset]
+            vid = body[offset + 1:offset + 1 + n].decode()
+            offset += 1 + n
+            lat, lng, speed, heading = _FLOATS4.unpack_from(body, offset)
+            offset += _FLOATS4.size
+            if not all(math.isfinite(x) for x in (lat, lng, speed, heading)):
+                raise ValueError(f"Non-finite value for {vid}")
+            updates.append((vid, lat, lng, speed, heading))
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError("Bad update payload") from e
+    return updates
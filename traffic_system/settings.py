@@ -26,6 +26,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.profiling.ProfileMiddleware',
 ]
 
 ROOT_URLCONF = 'traffic_system.urls'
@@ -46,6 +47,16 @@ TEMPLATES = [
     },
 ]
 
+if not DEBUG:
+    # Compile each template once per process instead of on every render.
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'traffic_system.wsgi.application'
 
 DATABASES = {
@@ -55,6 +66,32 @@ DATABASES = {
     }
 }
 
+# Operator status, login-failure counters and cached sessions live here.
+# LocMemCache is per process: with several workers or nodes, an admin change
+# only invalidates the worker that made it (others catch up within
+# core.auth.STATUS_TTL) and each worker keeps its own brute-force budget.
+# For multi-process deployments use a shared cache, e.g.
+#   'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379/1'
+# (pip install redis) or DatabaseCache after `manage.py createcachetable`.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'traffic-system',
+    }
+}
+
+# The per-IP failed-login limit (core.auth) keys on REMOTE_ADDR, which is
+# the load balancer's address for every request once the app sits behind
+# one; 20 typos across a shift would then lock everyone out. Set this to
+# the number of trusted proxies in front of Django so the client address
+# is read from X-Forwarded-For instead. Leave at 0 for direct connections,
+# since clients can forge the header.
+TRAFFIC_PROXY_HOPS = 0
+
+# Operator sessions: 'cached_db' serves session reads from the cache and only
+# writes SQLite on login/logout; 'signed_cookies' avoids the database entirely.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -69,5 +106,33 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'core' / 'static']
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# `manage.py collectstatic` writes content-hashed, precompressed assets;
+# with DEBUG off they are served by core.static_serving with far-future caching.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'core.storage.CompressedManifestStaticFilesStorage'},
+}
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Hot-table retention, enforced by `manage.py run_maintenance`
+TRAFFIC_RETENTION = {
+    'RESOLVED_ACCIDENT_HOURS': 6,
+    'VIOLATION_DAYS': 30,
+    'STALE_VEHICLE_MINUTES': 5,
+}
+
+# Live vehicle snapshot and event pub/sub (core.live_state). The in-memory
+# backend is per-process; run several app servers against Redis, or
+# `manage.py live_state_server` locally, with:
+#   LIVE_STATE = {'BACKEND': 'core.live_state.RedisBackend',
+#                 'OPTIONS': {'url': 'redis://127.0.0.1:6379/0'}}
+LIVE_STATE = {
+    'BACKEND': 'core.live_state.InMemoryBackend',
+}
+
+# Per-request profiles (X-Profile: cprofile|sample, Admin operators only)
+# and `vehicle_simulator.py --profile` output.
+TRAFFIC_PROFILE_DIR = BASE_DIR / 'profiles'
@@ -1,8 +1,8 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from core import views
+from core import views, static_serving
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -15,3 +15,5 @@ urlpatterns = [
 
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATICFILES_DIRS[0])
+else:
+    urlpatterns.insert(0, re_path(r'^static/(?P<path>.+)$', static_serving.serve))
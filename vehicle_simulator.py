@@ -3,6 +3,7 @@ Traffic Vehicle Simulator - Kathmandu Valley
 Simulates 100 vehicles, accidents, violations, and traffic signals.
 """
 
+import argparse
 import requests
 import time
 import random
@@ -10,30 +11,37 @@ import math
 import os
 import sys
 
+from core.roads import ROADS
+
 API_BASE = "http://127.0.0.1:8000/api"
 
 # ── CONFIG ──
 NUM_VEHICLES = 100
+TICK_SECONDS = 2
 vehicles = {}
+ingest_backoff = {"until": 0.0}   # set from Retry-After when the server sheds updates
+
+# ── RESPONDER UNITS ──
+RESPONDER_FLEET = {
+    "Ambulance": 8,
+    "Police": 8,
+    "Fire": 4,
+    "Traffic Police": 6,
+    "Tow Truck": 3,
+    "Rescue Team": 3,
+}
+responders = {}
 
-ROADS = [
-    {"name": "Ring Road North",   "start": (27.7300, 85.3100), "end": (27.7300, 85.3400)},
-    {"name": "Ring Road South",   "start": (27.6900, 85.3100), "end": (27.6900, 85.3400)},
-    {"name": "Ring Road East",    "start": (27.6950, 85.3450), "end": (27.7300, 85.3450)},
-    {"name": "Ring Road West",    "start": (27.6950, 85.2850), "end": (27.7300, 85.2850)},
-    {"name": "Durbar Marg",       "start": (27.7120, 85.3140), "end": (27.7200, 85.3200)},
-    {"name": "Kantipath",         "start": (27.7050, 85.3150), "end": (27.7200, 85.3150)},
-    {"name": "Maharajgunj",       "start": (27.7250, 85.3250), "end": (27.7350, 85.3350)},
-    {"name": "Balaju",            "start": (27.7250, 85.3050), "end": (27.7350, 85.3100)},
-    {"name": "Kalanki",           "start": (27.6950, 85.2800), "end": (27.7050, 85.3000)},
-    {"name": "Koteshwor",         "start": (27.6750, 85.3400), "end": (27.6900, 85.3500)},
-    {"name": "New Baneshwor",     "start": (27.6900, 85.3300), "end": (27.7000, 85.3400)},
-    {"name": "Thamel",            "start": (27.7150, 85.3100), "end": (27.7220, 85.3150)},
-    {"name": "Lazimpat",          "start": (27.7200, 85.3200), "end": (27.7280, 85.3250)},
-    {"name": "Patan Dhoka",       "start": (27.6750, 85.3200), "end": (27.6850, 85.3280)},
-    {"name": "Satdobato",         "start": (27.6600, 85.3250), "end": (27.6750, 85.3300)},
-    {"name": "Chabahil",          "start": (27.7180, 85.3400), "end": (27.7250, 85.3480)},
-]
+# ── SIGNAL SIMULATION ──
+STOP_LINE_SNAP_M = 600      # signals farther than this from a road don't control it
+APPROACH_M = 250            # upstream distance used for arrival estimates
+sim_signals = []
+stop_lines = {}             # road name -> [(signal, t)]
+sim_stats = {"crossings": 0}
+
+# ── PROFILING ──
+phase_times = {}            # phase name -> [seconds per call], filled with --profile
+profiler = {"sampler": None}
 
 LANES = ["Left", "Right", "Center"]
 
@@ -114,14 +122,93 @@ def init_signals():
     print(f"  Signals: {TrafficSignal.objects.count()} initialized")
 
 
-def cycle_signals():
+def cycle_signals(sim_time=None):
     from core.models import TrafficSignal
+    if sim_time is not None and sim_signals:
+        # Publish the simulated NS-approach state so the map matches what vehicles obey.
+        from core.signal_timing import phase_states
+        for sig in sim_signals:
+            ns_state, _ = phase_states(sig["cycle_time"], sig["green_split"], sim_time - sig["cycle_start"])
+            TrafficSignal.objects.filter(name=sig["name"]).update(
+                state=ns_state, cycle_time=sig["cycle_time"], green_split=sig["green_split"])
+        return
     states = ["Green", "Green", "Green", "Yellow", "Red", "Red", "Red"]
     for sig in TrafficSignal.objects.all():
         sig.state = random.choice(states)
         sig.save()
 
 
+def road_length_m(road):
+    dlat = (road["end"][0] - road["start"][0]) * 111320
+    dlng = (road["end"][1] - road["start"][1]) * 111320 * math.cos(math.radians(road["start"][0]))
+    return math.hypot(dlat, dlng)
+
+
+def road_heading(road):
+    dlat = road["end"][0] - road["start"][0]
+    dlng = road["end"][1] - road["start"][1]
+    return math.degrees(math.atan2(dlng, dlat)) % 360
+
+
+def project_onto_road(lat, lng, road):
+    """Return (t, distance_m) of the closest point on the road segment."""
+    k = 111320
+    c = math.cos(math.radians(road["start"][0]))
+    ax, ay = road["start"][1] * k * c, road["start"][0] * k
+    bx, by = road["end"][1] * k * c, road["end"][0] * k
+    px, py = lng * k * c, lat * k
+    dx, dy = bx - ax, by - ay
+    t = max(0, min(1, ((px - ax) * dx + (py - ay) * dy) / (dx * dx + dy * dy)))
+    return t, math.hypot(ax + t * dx - px, ay + t * dy - py)
+
+
+def init_signal_sim():
+    """Snap each signal to a stop line on every road it controls."""
+    sim_signals.clear()
+    stop_lines.clear()
+    for sig in TRAFFIC_SIGNALS:
+        state = {"name": sig["name"], "cycle_time": 60, "green_split": 0.5, "cycle_start": 0}
+        sim_signals.append(state)
+        for road in ROADS:
+            t, dist = project_onto_road(sig["lat"], sig["lng"], road)
+            if dist <= STOP_LINE_SNAP_M and 0 < t < 1:
+                stop_lines.setdefault(road["name"], []).append((state, t))
+    sim_stats["crossings"] = 0
+
+
+def approach_state(sig, road, sim_time):
+    from core.signal_timing import approach_of, phase_states
+    ns_state, ew_state = phase_states(sig["cycle_time"], sig["green_split"], sim_time - sig["cycle_start"])
+    return ns_state if approach_of(road_heading(road)) == "NS" else ew_state
+
+
+def advance_signal_plans(sim_time, adaptive):
+    """Start a new cycle for every signal whose cycle has elapsed."""
+    from core.signal_timing import approach_of, plan_timing
+    for sig in sim_signals:
+        if sim_time - sig["cycle_start"] < sig["cycle_time"]:
+            continue
+        if adaptive:
+            demand = {"NS": {"queue": 0, "arrival_rate": 0.0}, "EW": {"queue": 0, "arrival_rate": 0.0}}
+            for v in vehicles.values():
+                for line_sig, t in stop_lines.get(v["road"]["name"], ()):
+                    if line_sig is not sig:
+                        continue
+                    length = road_length_m(v["road"])
+                    ahead_m = (t - v["progress"]) * v["direction"] * length
+                    if not 0 <= ahead_m <= APPROACH_M:
+                        continue
+                    approach = approach_of(road_heading(v["road"]))
+                    if v["speed"] == 0:
+                        demand[approach]["queue"] += 1
+                    else:
+                        # Actual simulated ground speed, not the nominal km/h figure.
+                        ground_ms = v["speed"] * 0.00001 * length / TICK_SECONDS
+                        demand[approach]["arrival_rate"] += ground_ms / APPROACH_M
+            sig["cycle_time"], sig["green_split"] = plan_timing(demand, sig["cycle_time"])
+        sig["cycle_start"] = sim_time
+
+
 def init_vehicles():
     for i in range(NUM_VEHICLES):
         vid = f"BA-{random.randint(1, 9)}-PA-{random.randint(1000, 9999)}"
@@ -146,7 +233,45 @@ def init_vehicles():
         }
 
 
-def move_vehicles():
+def init_responders():
+    for unit_type, count in RESPONDER_FLEET.items():
+        prefix = "".join(w[0] for w in unit_type.split()).upper()
+        for i in range(count):
+            road = random.choice(ROADS)
+            responders[f"{prefix}-{i + 1:02d}"] = {
+                "unit_type": unit_type,
+                "road": road,
+                "progress": random.random(),
+                "direction": random.choice([1, -1]),
+            }
+
+
+def move_responders():
+    """Responders patrol slowly along their road, turning around at the ends."""
+    for r in responders.values():
+        r["progress"] += random.uniform(0, 0.004) * r["direction"]
+        if not 0 <= r["progress"] <= 1:
+            r["direction"] *= -1
+            r["progress"] = max(0, min(1, r["progress"]))
+        road, t = r["road"], r["progress"]
+        r["lat"] = road["start"][0] + t * (road["end"][0] - road["start"][0])
+        r["lng"] = road["start"][1] + t * (road["end"][1] - road["start"][1])
+
+
+def update_responders():
+    for uid, r in responders.items():
+        try:
+            requests.post(f"{API_BASE}/units/update/", json={
+                "unit_id": uid,
+                "unit_type": r["unit_type"],
+                "lat": round(r["lat"], 6),
+                "lng": round(r["lng"], 6),
+            }, timeout=2)
+        except requests.RequestException:
+            pass
+
+
+def move_vehicles(sim_time=None):
     for vid, v in vehicles.items():
         road = v["road"]
 
@@ -164,6 +289,8 @@ def move_vehicles():
 
         # Move along road
         step = v["speed"] * 0.00001 * v["direction"]
+        if sim_time is not None and stop_lines:
+            step = signal_step(v, step, sim_time)
         v["progress"] += step
 
         if v["progress"] > 1 or v["progress"] < 0:
@@ -184,16 +311,53 @@ def move_vehicles():
         v["lng"] += random.uniform(-0.0003, 0.0003)
 
 
-def update_server():
+def signal_step(v, step, sim_time):
+    """Clamp a vehicle's step so it waits at a red stop line; count crossings."""
+    road = v["road"]
+    start, end = v["progress"], v["progress"] + step
+    for sig, t in stop_lines.get(road["name"], ()):
+        if not min(start, end) < t <= max(start, end):
+            continue
+        if approach_state(sig, road, sim_time) != "Green":
+            v["speed"] = 0
+            return 0
+        sim_stats["crossings"] += 1
+    return step
+
+
+def _backed_off(response):
+    """Honour a 429 from the ingest queue; True if the caller should stop sending this tick."""
+    if response.status_code != 429:
+        return False
+    ingest_backoff["until"] = time.time() + float(response.headers.get("Retry-After", 1))
+    return True
+
+
+def update_server(binary=False):
+    if time.time() < ingest_backoff["until"]:
+        return
+    if binary:
+        # One packed request per tick instead of one JSON request per vehicle.
+        from core.wire import encode_updates, UPDATE_TYPE
+        body = encode_updates(
+            (vid, v["lat"], v["lng"], v["speed"], v["heading"]) for vid, v in vehicles.items())
+        try:
+            r = requests.post(f"{API_BASE}/update/", data=body, headers={"Content-Type": UPDATE_TYPE}, timeout=5)
+            _backed_off(r)
+        except requests.RequestException:
+            pass
+        return
     for vid, v in vehicles.items():
         try:
-            requests.post(f"{API_BASE}/update/", json={
+            r = requests.post(f"{API_BASE}/update/", json={
                 "vehicle_id": vid,
                 "lat": round(v["lat"], 6),
                 "lng": round(v["lng"], 6),
                 "speed": round(v["speed"], 1),
                 "heading": round(v["heading"], 1),
             }, timeout=2)
+            if _backed_off(r):
+                return
         except requests.RequestException:
             pass
 
@@ -256,7 +420,109 @@ def generate_violation():
         print(f"\n  [VIOLATION] {vtype['type']} - {vid} ({v['speed']:.0f} km/h) Fine: Rs.{vtype['fine']}")
 
 
+def run_benchmark(ticks, seed):
+    """Offline comparison of fixed-time vs adaptive signals with vehicles stopping at red."""
+    results = {}
+    for mode in ("fixed", "adaptive"):
+        random.seed(seed)
+        vehicles.clear()
+        init_vehicles()
+        init_signal_sim()
+        speed_total = 0
+        stopped_total = 0
+        for tick in range(ticks):
+            sim_time = tick * TICK_SECONDS
+            advance_signal_plans(sim_time, adaptive=(mode == "adaptive"))
+            move_vehicles(sim_time)
+            speeds = [v["speed"] for v in vehicles.values()]
+            speed_total += sum(speeds) / len(speeds)
+            stopped_total += sum(1 for s in speeds if s == 0)
+        hours = ticks * TICK_SECONDS / 3600
+        results[mode] = {
+            "avg_speed": speed_total / ticks,
+            "avg_stopped": stopped_total / ticks,
+            "throughput": sim_stats["crossings"] / hours,
+            "avg_cycle": sum(s["cycle_time"] for s in sim_signals) / len(sim_signals),
+        }
+
+    print(f"  Benchmark: {ticks} ticks ({ticks * TICK_SECONDS}s simulated), seed {seed}\n")
+    print(f"  {'Mode':<10}{'Avg speed':>12}{'Stopped':>10}{'Crossings/h':>14}{'Avg cycle':>12}")
+    for mode, r in results.items():
+        print(f"  {mode:<10}{r['avg_speed']:>9.1f} km/h{r['avg_stopped']:>10.1f}"
+              f"{r['throughput']:>14.0f}{r['avg_cycle']:>10.0f} s")
+    return results
+
+
+def timed(name, fn, *args):
+    """Run one tick phase; with --profile, record its duration and sample its stacks."""
+    sampler = profiler["sampler"]
+    if sampler is None:
+        return fn(*args)
+    sampler.active.set()
+    started = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        phase_times.setdefault(name, []).append(time.perf_counter() - started)
+        sampler.active.clear()
+
+
+def start_profiling():
+    from core.profiling import Sampler
+    sampler = Sampler(root=main.__code__)
+    sampler.active.clear()
+    profiler["sampler"] = sampler.start()
+
+
+def write_profile():
+    import json
+    from core.profiling import output_path, write_collapsed
+
+    counts = profiler["sampler"].stop()
+    wall = sum(sum(t) for t in phase_times.values()) or 1
+    summary = {}
+    print(f"\n  {'Phase':<20}{'Calls':>7}{'Total s':>10}{'Mean ms':>10}{'p95 ms':>10}{'Max ms':>10}{'Share':>8}")
+    for name, times in sorted(phase_times.items(), key=lambda kv: -sum(kv[1])):
+        ordered = sorted(times)
+        summary[name] = {
+            "calls": len(times),
+            "total_s": round(sum(times), 4),
+            "mean_ms": round(sum(times) / len(times) * 1000, 3),
+            "p95_ms": round(ordered[math.ceil(0.95 * len(ordered)) - 1] * 1000, 3),
+            "max_ms": round(ordered[-1] * 1000, 3),
+        }
+        row = summary[name]
+        print(f"  {name:<20}{row['calls']:>7}{row['total_s']:>10.2f}{row['mean_ms']:>10.1f}{row['p95_ms']:>10.1f}"
+              f"{row['max_ms']:>10.1f}{sum(times) / wall:>8.0%}")
+    folded = write_collapsed(counts, output_path("simulator", ".folded"))
+    with open(folded[:-len(".folded")] + "_phases.json", "w") as f:
+        json.dump(summary, f, indent=2)
+    print(f"\n  Flamegraph stacks: {folded}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Kathmandu traffic simulator")
+    parser.add_argument("--stop-at-red", action="store_true",
+                        help="vehicles stop at red signals instead of signals changing randomly")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="with --stop-at-red, re-plan signal timing from queues each cycle")
+    parser.add_argument("--benchmark", type=int, metavar="TICKS",
+                        help="run fixed vs adaptive signals offline for TICKS ticks and exit")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for --benchmark")
+    parser.add_argument("--binary", action="store_true",
+                        help="send all position updates per tick as one packed binary request")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each tick phase and write collapsed stacks on exit")
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+    if args.benchmark:
+        setup_django()
+        run_benchmark(args.benchmark, args.seed)
+        return
+
     print("=" * 55)
     print("   Kathmandu Traffic Simulator")
     print("   Vehicles: %d | Roads: %d | Signals: %d" % (NUM_VEHICLES, len(ROADS), len(TRAFFIC_SIGNALS)))
@@ -265,22 +531,37 @@ def main():
     setup_django()
     init_signals()
     init_vehicles()
+    init_responders()
+    if args.stop_at_red:
+        init_signal_sim()
 
     print(f"  Vehicles: {len(vehicles)} initialized")
+    print(f"  Responders: {len(responders)} initialized")
     print("  Press Ctrl+C to stop\n")
 
+    if args.profile:
+        start_profiling()
+
     tick = 0
     while True:
         try:
-            move_vehicles()
-            update_server()
+            sim_time = tick * TICK_SECONDS if args.stop_at_red else None
+            if sim_time is not None:
+                timed("advance_signal_plans", advance_signal_plans, sim_time, args.adaptive)
+            timed("move_vehicles", move_vehicles, sim_time)
+            timed("update_server", update_server, args.binary)
+            if tick % 5 == 0:
+                timed("move_responders", move_responders)
+                timed("update_responders", update_responders)
 
             if tick % 3 == 0:
-                generate_accident()
+                timed("generate_accident", generate_accident)
             if tick % 2 == 0:
-                generate_violation()
-            if tick % 5 == 0:
-                cycle_signals()
+                timed("generate_violation", generate_violation)
+            if sim_time is not None:
+                timed("cycle_signals", cycle_signals, sim_time)
+            elif tick % 5 == 0:
+                timed("cycle_signals", cycle_signals)
 
             tick += 1
             speeds = [v["speed"] for v in vehicles.values()]
@@ -297,7 +578,7 @@ def main():
             )
             sys.stdout.flush()
 
-            time.sleep(2)
+            time.sleep(TICK_SECONDS)
 
         except KeyboardInterrupt:
             print("\n\n  Simulator stopped.")
@@ -306,6 +587,9 @@ def main():
             print(f"\n  Error: {e}")
             time.sleep(2)
 
+    if args.profile:
+        write_profile()
+
 
 if __name__ == "__main__":
     main()